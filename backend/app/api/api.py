@@ -1,7 +1,15 @@
-from fastapi import APIRouter, Query
+import time
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from typing import Union
-from app.services.chat_handler import get_intent_and_execute
+from typing import List, Optional, Tuple, Union
+from app.core.config import settings
+from app.services.chat_handler import execute_batch, get_intent_and_execute
+from app.services.data_loader import data_loader
+from app.services.cache import cache_stats
+from app.services.query_analytics import last_prewarm
+from app.services.query_log import query_log
+from app.services.speech_service import speech_service
+from app.services.token_accounting import token_accountant
 
 class ItemSearchResponse(BaseModel):
     query: str
@@ -11,13 +19,66 @@ class ItemSearchResponse(BaseModel):
 class InfoSearchResponse(BaseModel):
     info: str
 
+class BatchChatRequest(BaseModel):
+    queries: List[str]
+    x: Optional[float] = None  # user's map position, applied to every query like /chat's x, y and line_id
+    y: Optional[float] = None
+    line_id: Optional[str] = None
+
+class BatchChatItem(BaseModel):
+    query: str
+    direction: Optional[str] = None
+    name: Optional[str] = None
+    info: Optional[str] = None
+    error: Optional[str] = None
+
+class BatchChatResponse(BaseModel):
+    results: List[BatchChatItem]
+
+class NearbyLine(BaseModel):
+    line_id: str
+    line_name: str
+    aisle: int
+    order: int
+    distance: float
+    direction: str
+    matched_term: Optional[str] = None
+
+class NearbyResponse(BaseModel):
+    x: float
+    y: float
+    results: List[NearbyLine]
+
+def resolve_origin(x: Optional[float], y: Optional[float], line_id: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Map position of the user: a scanned line QR code wins over tapped coordinates"""
+    if line_id:
+        position = data_loader.get_line_position(line_id)
+        if position is None:
+            raise HTTPException(status_code=404, detail=f"Unknown or unmapped line '{line_id}'")
+        return position
+    if x is not None and y is not None:
+        return x, y
+    return None
+
 class ChatInterface:
     def __init__(self):
         self.router = APIRouter()
 
         @self.router.get("/chat", response_model=Union[ItemSearchResponse, InfoSearchResponse])
-        async def chat(q: str = Query(..., description="The user query")):
-            result = get_intent_and_execute(q)
+        async def chat(
+            q: str = Query(..., description="The user query"),
+            x: Optional[float] = Query(None, description="User's map x position (pixels on the market map)"),
+            y: Optional[float] = Query(None, description="User's map y position (pixels on the market map)"),
+            line_id: Optional[str] = Query(None, description="Line ID from a QR code scanned at a stall"),
+        ):
+            start = time.perf_counter()
+            result = get_intent_and_execute(q, resolve_origin(x, y, line_id))
+            query_log.record(
+                q,
+                "search" if "direction" in result else "info",
+                result.get("line_id"),
+                time.perf_counter() - start,
+            )
             if 'direction' in result:
                 return ItemSearchResponse(
                     query=q,
@@ -26,5 +87,50 @@ class ChatInterface:
                 )
             return InfoSearchResponse(info=result.get("info"))
 
+        @self.router.post("/chat/batch", response_model=BatchChatResponse)
+        async def chat_batch(request: BatchChatRequest):
+            if not request.queries:
+                raise HTTPException(status_code=422, detail="queries must not be empty")
+            if len(request.queries) > settings.BATCH_MAX_QUERIES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"At most {settings.BATCH_MAX_QUERIES} queries per batch"
+                )
+            origin = resolve_origin(request.x, request.y, request.line_id)
+            start = time.perf_counter()
+            results = await execute_batch(request.queries, origin)
+            latency = time.perf_counter() - start
+            for query, result in zip(request.queries, results):
+                intent = "error" if "error" in result else "search" if "direction" in result else "info"
+                query_log.record(query, intent, result.get("line_id"), latency)
+            return BatchChatResponse(results=[
+                BatchChatItem(query=query, **{key: str(value) for key, value in result.items() if key != "line_id"})
+                for query, result in zip(request.queries, results)
+            ])
+
+        @self.router.get("/nearby", response_model=NearbyResponse)
+        async def nearby(
+            x: Optional[float] = Query(None, description="User's map x position (pixels on the market map)"),
+            y: Optional[float] = Query(None, description="User's map y position (pixels on the market map)"),
+            line_id: Optional[str] = Query(None, description="Line ID from a QR code scanned at a stall"),
+            item: Optional[str] = Query(None, description="Only lines selling this item"),
+            k: int = Query(5, ge=1, le=50, description="Number of lines to return"),
+        ):
+            origin = resolve_origin(x, y, line_id)
+            if origin is None:
+                raise HTTPException(status_code=422, detail="Provide x and y, or line_id")
+            results = data_loader.nearest_lines(origin[0], origin[1], keyword=item, k=k)
+            return NearbyResponse(x=origin[0], y=origin[1], results=[NearbyLine(**line) for line in results])
+
+        @self.router.get("/metrics")
+        async def metrics():
+            return {
+                "llm": token_accountant.snapshot(),
+                "caches": cache_stats(),
+                "query_log": query_log.stats(),
+                "prewarm": last_prewarm,
+                "speech": speech_service.stats(),
+            }
+
 # Instantiate the class and store in a variable named api
 api = ChatInterface()
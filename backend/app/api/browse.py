@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from typing import Optional
+from app.services.browse_service import BrowseError, Prepared, browse_service, etag_matches
+
+
+class CatalogInterface:
+    def __init__(self):
+        self.router = APIRouter(prefix="/catalog", tags=["catalog"])
+
+        def respond(prepared: Optional[Prepared], if_none_match: Optional[str], missing: str) -> Response:
+            if prepared is None:
+                raise HTTPException(status_code=404, detail=missing)
+            body, etag = prepared
+            headers = {"ETag": etag, "Cache-Control": "public, no-cache"}
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers=headers)
+            return Response(content=body, media_type="application/json", headers=headers)
+
+        @self.router.get("/aisles")
+        async def list_aisles(if_none_match: Optional[str] = Header(None)):
+            """Aisles with their line counts"""
+            return respond(browse_service.get_aisles(), if_none_match, "No aisles")
+
+        @self.router.get("/aisles/{aisle}/lines")
+        async def list_aisle_lines(
+            aisle: int,
+            cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+            limit: Optional[int] = Query(None, description="Page size"),
+            if_none_match: Optional[str] = Header(None),
+        ):
+            """Lines in an aisle, in walking order"""
+            try:
+                prepared = browse_service.get_aisle_lines(aisle, cursor, limit)
+            except BrowseError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            return respond(prepared, if_none_match, f"Aisle {aisle} not found")
+
+        @self.router.get("/lines/{line_id}")
+        async def get_line(line_id: str, if_none_match: Optional[str] = Header(None)):
+            """Line details: items sold, direction, map position and photo"""
+            return respond(browse_service.get_line(line_id), if_none_match, f"Line '{line_id}' not found")
+
+        @self.router.get("/items")
+        async def list_items(
+            cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+            limit: Optional[int] = Query(None, description="Page size"),
+            if_none_match: Optional[str] = Header(None),
+        ):
+            """Distinct items with the number of lines selling each"""
+            try:
+                prepared = browse_service.get_items(cursor, limit)
+            except BrowseError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            return respond(prepared, if_none_match, "No items")
+
+
+browse = CatalogInterface()
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from typing import Optional
+from app.services.answer_bundle import Prepared, answer_bundle_service
+from app.services.browse_service import etag_matches
+
+
+class BundleInterface:
+    def __init__(self):
+        self.router = APIRouter(prefix="/bundle", tags=["bundle"])
+
+        def respond(prepared: Prepared, if_none_match: Optional[str], accept_encoding: Optional[str]) -> Response:
+            body, gzipped, etag = prepared
+            # Versions never change content, so clients may keep them for a long time
+            headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable", "Vary": "Accept-Encoding"}
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers=headers)
+            if accept_encoding and "gzip" in accept_encoding:
+                headers["Content-Encoding"] = "gzip"
+                return Response(content=gzipped, media_type="application/json", headers=headers)
+            return Response(content=body, media_type="application/json", headers=headers)
+
+        @self.router.get("")
+        async def get_bundle(
+            if_none_match: Optional[str] = Header(None),
+            accept_encoding: Optional[str] = Header(None),
+        ):
+            """The full answer bundle for the current catalog version"""
+            response = respond(answer_bundle_service.current, if_none_match, accept_encoding)
+            # The unversioned URL changes with the catalog, so revalidate it
+            response.headers["Cache-Control"] = "public, no-cache"
+            return response
+
+        @self.router.get("/version")
+        async def get_version():
+            """Current version, size, and the versions deltas are available from"""
+            return answer_bundle_service.info()
+
+        @self.router.get("/delta")
+        async def get_delta(
+            from_version: str = Query(..., alias="from", description="Version the client already has"),
+            if_none_match: Optional[str] = Header(None),
+            accept_encoding: Optional[str] = Header(None),
+        ):
+            """Changes from an earlier version to the current one (empty if already current)"""
+            prepared = answer_bundle_service.get_delta(from_version)
+            if prepared is None:
+                raise HTTPException(status_code=404, detail=f"No delta from version '{from_version}'; download /bundle")
+            response = respond(prepared, if_none_match, accept_encoding)
+            # The target is whatever is current, so this URL changes with the catalog: revalidate it
+            response.headers["Cache-Control"] = "public, no-cache"
+            return response
+
+
+bundle = BundleInterface()
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+from app.services.profiler import profiler
+
+
+class ProfilingInterface:
+    def __init__(self):
+        self.router = APIRouter(prefix="/debug/profile", include_in_schema=False)
+
+        def authorize(token: Optional[str]):
+            # Hide the endpoints entirely unless profiling is on and the token matches
+            if not profiler.is_authorized(token):
+                raise HTTPException(status_code=404, detail="Not Found")
+
+        def collapsed_response(kind: str) -> PlainTextResponse:
+            stats = profiler.stats()
+            return PlainTextResponse(
+                profiler.collapsed(kind),
+                headers={
+                    "Content-Disposition": f'attachment; filename="{kind}-{stats["pid"]}.collapsed"',
+                    "X-Worker-Pid": str(stats["pid"]),
+                },
+            )
+
+        @self.router.get("")
+        async def profile_stats(x_profile: Optional[str] = Header(None)):
+            authorize(x_profile)
+            return profiler.stats()
+
+        @self.router.get("/cpu")
+        async def cpu_stacks(x_profile: Optional[str] = Header(None)):
+            authorize(x_profile)
+            return collapsed_response("cpu")
+
+        @self.router.get("/alloc")
+        async def alloc_stacks(x_profile: Optional[str] = Header(None)):
+            authorize(x_profile)
+            return collapsed_response("alloc")
+
+        @self.router.post("/reset")
+        async def reset(x_profile: Optional[str] = Header(None)):
+            authorize(x_profile)
+            profiler.reset()
+            return profiler.stats()
+
+
+profiling = ProfilingInterface()
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from typing import Optional
+from app.services.browse_service import etag_matches
+from app.services.profiler import to_thread
+from app.services.speech_service import parse_range, speech_service
+
+
+class SpeechInterface:
+    def __init__(self):
+        self.router = APIRouter(prefix="/speech", tags=["speech"])
+
+        @self.router.get("/directions")
+        async def spoken_directions(
+            line_id: str = Query(..., description="Line to walk to"),
+            item: Optional[str] = Query(None, description="Item sold on that line"),
+            range_header: Optional[str] = Header(None, alias="Range"),
+            if_range: Optional[str] = Header(None),
+            if_none_match: Optional[str] = Header(None),
+        ):
+            """Navigation directions to a line (and item) as audio"""
+            try:
+                spoken = await to_thread(speech_service.speak, line_id, item)
+            except Exception as e:
+                raise HTTPException(status_code=503, detail=f"Speech synthesis failed: {e}")
+            if spoken is None:
+                raise HTTPException(status_code=404, detail=f"Line '{line_id}' does not sell '{item}'" if item
+                                    else f"Line '{line_id}' not found")
+            data, media_type, etag = spoken
+
+            headers = {"ETag": etag, "Accept-Ranges": "bytes", "Cache-Control": "public, no-cache"}
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers=headers)
+
+            # If-Range: only honour the range if the client's copy is this one
+            if if_range and if_range != etag:
+                range_header = None
+            try:
+                byte_range = parse_range(range_header, len(data))
+            except ValueError:
+                headers["Content-Range"] = f"bytes */{len(data)}"
+                return Response(status_code=416, headers=headers)
+            if byte_range is None:
+                return Response(content=data, media_type=media_type, headers=headers)
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+            return Response(content=data[start:end + 1], status_code=206, media_type=media_type, headers=headers)
+
+
+speech = SpeechInterface()
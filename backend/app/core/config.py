@@ -22,4 +22,56 @@ class Settings:
     gemini_model = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
     temperature = os.getenv("TEMPERATURE")
 
+    # Prompt variant for every LLM stage: "full" or "compact"
+    PROMPT_VARIANT = os.getenv("PROMPT_VARIANT", "full")
+
+    # In-process result caches (routing, navigation, info)
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+    CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "86400"))
+    # Cross-process tier (SQLite WAL) behind the in-process caches; empty disables it.
+    # `python -m app.serve --workers N` defaults it to data/cache/shared.sqlite3 when N > 1.
+    SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", "")
+    SHARED_CACHES = os.getenv("SHARED_CACHES", "routing,keyword,navigation,info")
+    SHARED_CACHE_MAX_ENTRIES = int(os.getenv("SHARED_CACHE_MAX_ENTRIES", "50000"))
+
+    # Query log and cache prewarming ahead of peak market hours
+    QUERY_LOG_ENABLED = os.getenv("QUERY_LOG_ENABLED", "true").lower() == "true"
+    QUERY_LOG_PATH = os.getenv("QUERY_LOG_PATH", os.path.join(DATA_DIR, "logs", "queries.jsonl"))
+    QUERY_LOG_MAX_BYTES = int(os.getenv("QUERY_LOG_MAX_BYTES", "10000000"))
+    QUERY_LOG_BACKUPS = int(os.getenv("QUERY_LOG_BACKUPS", "5"))
+    PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "false").lower() == "true"
+    MARKET_DAYS = os.getenv("MARKET_DAYS", "mon,tue,wed,thu,fri,sat,sun")
+    PREWARM_TIME = os.getenv("PREWARM_TIME", "05:30")
+    PEAK_HOURS = os.getenv("PEAK_HOURS", "6-10")
+    PREWARM_LIMIT = int(os.getenv("PREWARM_LIMIT", "100"))
+
+    # Batch chat endpoint limits
+    BATCH_MAX_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", "100"))
+    BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+    # Catalog browse API pagination
+    BROWSE_PAGE_SIZE = int(os.getenv("BROWSE_PAGE_SIZE", "50"))
+    BROWSE_MAX_PAGE_SIZE = int(os.getenv("BROWSE_MAX_PAGE_SIZE", "500"))
+
+    # Offline answer bundles: built versions kept for delta updates
+    BUNDLE_DIR = os.getenv("BUNDLE_DIR", os.path.join(DATA_DIR, "bundles"))
+    BUNDLE_KEEP = int(os.getenv("BUNDLE_KEEP", "5"))
+
+    # Spoken directions: TTS engine ("gtts" or the offline "tone" stand-in) and audio cache
+    TTS_ENGINE = os.getenv("TTS_ENGINE", "gtts")
+    TTS_LANG = os.getenv("TTS_LANG", "en")
+    TTS_TLD = os.getenv("TTS_TLD", "com")
+    TTS_FAILURE_COOLDOWN_SECONDS = float(os.getenv("TTS_FAILURE_COOLDOWN_SECONDS", "60"))
+    SPEECH_CACHE_DIR = os.getenv("SPEECH_CACHE_DIR", os.path.join(DATA_DIR, "audio"))
+    SPEECH_CACHE_MAX_BYTES = int(os.getenv("SPEECH_CACHE_MAX_BYTES", "200000000"))
+    SPEECH_WARMUP = os.getenv("SPEECH_WARMUP", "false").lower() == "true"
+    SPEECH_WARMUP_CONCURRENCY = int(os.getenv("SPEECH_WARMUP_CONCURRENCY", "4"))
+
+    # On-demand profiling (off unless PROFILING_ENABLED=true)
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    PROFILE_TRACEMALLOC = os.getenv("PROFILE_TRACEMALLOC", "false").lower() == "true"
+
 settings = Settings()
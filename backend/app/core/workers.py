@@ -0,0 +1,27 @@
+"""
+Worker identity for multi-process serving
+app.serve sets WORKER_INDEX in each forked worker; the app reads it here so it
+does not depend on how it was launched. Kept free of app.core.config, which
+app.serve must not import before it has set its environment defaults.
+"""
+
+import os
+
+# Set in each forked worker to its number, 0..workers-1
+WORKER_INDEX_ENV = "WORKER_INDEX"
+
+
+def set_worker_index(number: int):
+    """Record this process's worker number (called by the launcher after forking)"""
+    os.environ[WORKER_INDEX_ENV] = str(number)
+
+
+def is_primary_worker() -> bool:
+    """
+    Whether this process runs once-per-deployment background jobs
+
+    True in a single-process server and in worker 0 under app.serve (a
+    restarted worker 0 keeps the role), so the workers do not repeat the same
+    LLM and TTS work or race on the same cache files.
+    """
+    return os.getenv(WORKER_INDEX_ENV, "0") == "0"
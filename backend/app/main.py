@@ -1,7 +1,11 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
+from app.services.profiler import ProfilingMiddleware, profiler
+from app.services.query_analytics import prewarm_scheduler
+from app.core.workers import is_primary_worker
 # Import routers will be added later
 # from app.api import api
 
@@ -20,9 +24,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Sampling profiler; a no-op pass-through unless PROFILING_ENABLED is set
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
 # Mount static files for images
 app.mount("/images", StaticFiles(directory=settings.IMAGES_DIR), name="images")
 
+# Background jobs run in one worker only; the shared caches carry their results to the others
+@app.on_event("startup")
+async def start_prewarm_scheduler():
+    if settings.PREWARM_ENABLED and is_primary_worker():
+        app.state.prewarm_task = asyncio.create_task(prewarm_scheduler())
+
+@app.on_event("startup")
+async def start_speech_warmup():
+    # Spoken directions for every line/item pair, synthesized in the background
+    if settings.SPEECH_WARMUP and is_primary_worker():
+        from app.services.speech_service import speech_service
+        app.state.speech_warmup = asyncio.create_task(asyncio.to_thread(speech_service.pregenerate, settings.SPEECH_WARMUP_CONCURRENCY))
+
 @app.get("/")
 async def root():
     return {
@@ -34,3 +54,11 @@ async def root():
 # Include routers
 from app.api.api import api
 app.include_router(api.router)
+from app.api.profiling import profiling
+app.include_router(profiling.router)
+from app.api.browse import browse
+app.include_router(browse.router)
+from app.api.bundle import bundle
+app.include_router(bundle.router)
+from app.api.speech import speech
+app.include_router(speech.router)
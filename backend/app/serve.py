@@ -0,0 +1,148 @@
+"""
+Multi-worker server for Sabi Market
+Imports the app once in the parent (catalog, indexes, bundles, LLM clients),
+freezes those objects out of the garbage collector so their memory pages stay
+shared copy-on-write, then forks uvicorn workers that accept on one socket.
+Routing, keyword, navigation and info results are shared between workers
+through the SQLite cache tier (SHARED_CACHE_PATH). Background jobs started by
+the app's startup hooks (prewarming, speech warmup) run in worker 0 only.
+
+Usage (from backend/):
+    python -m app.serve --host 0.0.0.0 --port 8000 --workers 4
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Callable, Dict
+
+from app.core.workers import set_worker_index
+
+
+def configure(workers: int):
+    """Environment defaults that must be set before the app is imported"""
+    if workers > 1:
+        # Settings reads the environment when app.core.config is first imported
+        backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        os.environ.setdefault("SHARED_CACHE_PATH", os.path.join(backend_dir, "data", "cache", "shared.sqlite3"))
+    # gRPC-based clients created in the parent must survive the fork
+    os.environ.setdefault("GRPC_ENABLE_FORK_SUPPORT", "true")
+
+
+def freeze_preloaded():
+    """
+    Move everything allocated so far to the permanent GC generation.
+
+    Collections in the workers then never touch (and so never copy) the
+    parent's pages for these objects.
+    """
+    gc.collect()
+    gc.freeze()
+    print(f"Froze {gc.get_freeze_count()} preloaded objects before forking")
+
+
+def run_workers(count: int, target: Callable[[], None], restart: bool = True) -> int:
+    """
+    Fork `count` workers running `target` and supervise them until SIGINT/SIGTERM
+
+    Args:
+        count: Number of worker processes
+        target: Worker body; the worker exits when it returns
+        restart: Replace workers that die unexpectedly
+
+    Returns:
+        Process exit code
+    """
+    children: Dict[int, int] = {}  # pid -> worker number
+    stopping = False
+
+    def spawn(number: int):
+        pid = os.fork()
+        if pid == 0:
+            # Child: default signal handling, run, never return into the supervisor
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            set_worker_index(number)
+            code = 0
+            try:
+                target()
+            except BaseException as e:
+                print(f"Worker {number} failed: {e}")
+                code = 1
+            finally:
+                sys.stdout.flush()
+                os._exit(code)
+        children[pid] = number
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    previous = {signum: signal.signal(signum, stop) for signum in (signal.SIGINT, signal.SIGTERM)}
+    for number in range(count):
+        spawn(number)
+
+    exit_code = 0
+    try:
+        while children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            number = children.pop(pid, None)
+            if number is None:
+                continue
+            if not stopping and restart:
+                print(f"Worker {number} (pid {pid}) exited with status {status}; restarting")
+                time.sleep(1)
+                spawn(number)
+            elif status:
+                exit_code = 1
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+    return exit_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API with preloaded, fork-shared workers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")))
+    args = parser.parse_args()
+
+    configure(args.workers)
+
+    import uvicorn
+    from app.main import app
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    print(f"Listening on http://{args.host}:{args.port} with {args.workers} workers")
+
+    freeze_preloaded()
+
+    def serve():
+        server = uvicorn.Server(uvicorn.Config(app, log_level="info"))
+        server.run(sockets=[sock])
+
+    if args.workers <= 1:
+        serve()
+        return
+    sys.exit(run_workers(args.workers, serve))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Offline answer bundle for Sabi Market
+Everything a client needs to answer "where can I buy X?" without a round trip:
+which lines sell each item, deterministic walking directions to every line,
+and line photo URLs. A bundle is versioned by the hash of its content; built
+versions are kept on disk so clients holding an older one can fetch a delta.
+
+Build step (run after editing marketway.json, or at deploy):
+    python -m app.services.answer_bundle
+"""
+
+import glob
+import gzip
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from .data_loader import DataLoader, data_loader
+
+
+BUNDLE_FORMAT = 1
+# Fields of each entry in bundle["lines"], in order
+LINE_FIELDS = ["line_name", "aisle", "order", "walk", "image_url"]
+# Directions for an item at a line: template.format(walk=..., item=..., line=...)
+DIRECTIONS_TEMPLATE = "{walk} Ask for {item} at {line}."
+
+
+def _dumps(value) -> bytes:
+    return json.dumps(value, separators=(",", ":"), sort_keys=True, ensure_ascii=False).encode("utf-8")
+
+
+def content_hash(content: Dict) -> str:
+    """Version of a bundle: hash of everything except the version itself"""
+    content = {key: value for key, value in content.items() if key != "version"}
+    return hashlib.sha256(_dumps(content)).hexdigest()[:16]
+
+
+def build_bundle(loader: DataLoader) -> Dict:
+    """
+    Build the answer bundle for the loaded catalog
+
+    Args:
+        loader: DataLoader (catalog, walking directions and image URLs)
+
+    Returns:
+        {"version", "format", "line_fields", "template",
+         "lines": {line_id: [line_name, aisle, order, walk, image_url]},
+         "items": {item: [line_id, ...] sorted by sort_line_ids}}
+    """
+    catalog = loader.catalog
+    lines = {
+        line["line_id"]: [
+            line["line_name"], line["aisle"], line["order"],
+            loader.get_walking_directions(line), loader.get_image_url(line["line_id"]),
+        ]
+        for line in catalog
+    }
+    items = {term: sort_line_ids(lines, [catalog.line_ids[row] for row in rows])
+             for term, rows in catalog.rows_by_item.items()}
+    bundle = {
+        "format": BUNDLE_FORMAT,
+        "line_fields": LINE_FIELDS,
+        "template": DIRECTIONS_TEMPLATE,
+        "lines": lines,
+        "items": items,
+    }
+    bundle["version"] = content_hash(bundle)
+    return bundle
+
+
+def sort_line_ids(lines: Dict[str, List], line_ids: List[str]) -> List[str]:
+    """Walking order (aisle, order, then ID), which clients reproduce when applying deltas"""
+    return sorted(line_ids, key=lambda line_id: (lines[line_id][1], lines[line_id][2], line_id))
+
+
+def directions_for(bundle: Dict, item: str) -> Optional[str]:
+    """What a client does offline: directions to the first line selling an item"""
+    line_ids = bundle["items"].get(item.lower())
+    if not line_ids:
+        return None
+    line_name, _, _, walk, _ = bundle["lines"][line_ids[0]]
+    return bundle["template"].format(walk=walk, item=item, line=line_name)
+
+
+def _diff_lines(old: Dict, new: Dict) -> Dict:
+    return {
+        "upsert": {key: value for key, value in new.items() if old.get(key) != value},
+        "remove": sorted(key for key in old if key not in new),
+    }
+
+
+def _diff_items(old: Dict, new: Dict) -> Dict:
+    """Per item, only the line IDs added and dropped; whole lists would resend most of the index"""
+    add, drop = {}, {}
+    for term, line_ids in new.items():
+        before = set(old.get(term, ()))
+        added = [line_id for line_id in line_ids if line_id not in before]
+        dropped = sorted(before - set(line_ids))
+        if added:
+            add[term] = added
+        if dropped:
+            drop[term] = dropped
+    return {"add": add, "drop": drop, "remove": sorted(term for term in old if term not in new)}
+
+
+def diff_bundles(old: Dict, new: Dict) -> Dict:
+    """
+    Delta that turns `old` into `new`
+
+    Returns:
+        {"from", "to", "format", "line_fields", "template",
+         "lines": {"upsert": {line_id: line}, "remove": [line_id, ...]},
+         "items": {"add": {item: [line_id, ...]}, "drop": {item: [line_id, ...]}, "remove": [item, ...]}}
+    """
+    return {
+        "from": old["version"],
+        "to": new["version"],
+        "format": new["format"],
+        "line_fields": new["line_fields"],
+        "template": new["template"],
+        "lines": _diff_lines(old["lines"], new["lines"]),
+        "items": _diff_items(old["items"], new["items"]),
+    }
+
+
+def apply_delta(bundle: Dict, delta: Dict) -> Dict:
+    """
+    Apply a delta the way a client would, checking the result's hash
+
+    Raises:
+        ValueError: If the delta is for another version or the result does not hash to delta["to"]
+    """
+    if bundle["version"] != delta["from"]:
+        raise ValueError(f"Delta is from {delta['from']}, bundle is {bundle['version']}")
+    updated = {key: delta[key] for key in ("format", "line_fields", "template")}
+
+    removed = set(delta["lines"]["remove"])
+    lines = {key: value for key, value in bundle["lines"].items() if key not in removed}
+    lines.update(delta["lines"]["upsert"])
+    updated["lines"] = lines
+
+    removed = set(delta["items"]["remove"])
+    items = {term: line_ids for term, line_ids in bundle["items"].items() if term not in removed}
+    changed = set(delta["items"]["add"]) | set(delta["items"]["drop"])
+    # Lines that moved change the walking order of every item they sell
+    moved = {line_id for line_id, line in delta["lines"]["upsert"].items()
+             if line_id in bundle["lines"] and bundle["lines"][line_id][1:3] != line[1:3]}
+    if moved:
+        changed.update(term for term, line_ids in items.items() if not moved.isdisjoint(line_ids))
+    for term in changed:
+        dropped = set(delta["items"]["drop"].get(term, ()))
+        line_ids = [line_id for line_id in items.get(term, ()) if line_id not in dropped]
+        items[term] = sort_line_ids(lines, line_ids + delta["items"]["add"].get(term, []))
+    updated["items"] = items
+
+    updated["version"] = content_hash(updated)
+    if updated["version"] != delta["to"]:
+        raise ValueError(f"Delta produced {updated['version']}, expected {delta['to']}")
+    return updated
+
+
+class BundleStore:
+    """
+    Built bundles on disk, newest kept, one file per version
+
+    The order of versions is kept in a manifest rather than taken from file
+    times, so the directory can be committed with the catalog and deployed
+    from a fresh checkout.
+    """
+
+    MANIFEST = "versions.json"
+
+    def __init__(self, directory: str, keep: int = 5):
+        self.directory = directory
+        self.keep = keep
+
+    def path(self, version: str) -> str:
+        return os.path.join(self.directory, f"bundle-{version}.json")
+
+    def _read_manifest(self) -> List[str]:
+        try:
+            with open(os.path.join(self.directory, self.MANIFEST), "rb") as f:
+                versions = json.loads(f.read())
+            return [version for version in versions if isinstance(version, str)]
+        except (OSError, ValueError):
+            return []
+
+    def _write_manifest(self, versions: List[str]):
+        path = os.path.join(self.directory, self.MANIFEST)
+        with open(path + ".tmp", "wb") as f:
+            f.write(json.dumps(versions, indent=1).encode("utf-8") + b"\n")
+        os.replace(path + ".tmp", path)
+
+    def save(self, bundle: Dict) -> str:
+        """Write a bundle (if new), make it the newest version and drop the oldest beyond `keep`"""
+        os.makedirs(self.directory, exist_ok=True)
+        version = bundle["version"]
+        path = self.path(version)
+        if not os.path.exists(path):
+            with open(path + ".tmp", "wb") as f:
+                f.write(_dumps(bundle))
+            os.replace(path + ".tmp", path)
+        versions = [version] + [self._version_of(other) for other in self.paths() if other != path]
+        for stale in versions[self.keep:]:
+            os.remove(self.path(stale))
+        self._write_manifest(versions[:self.keep])
+        return path
+
+    @staticmethod
+    def _version_of(path: str) -> str:
+        return os.path.basename(path)[len("bundle-"):-len(".json")]
+
+    def paths(self) -> List[str]:
+        """Bundle files, newest first: manifest order, then any unlisted files by modification time"""
+        files = glob.glob(os.path.join(self.directory, "bundle-*.json"))
+        listed = [self.path(version) for version in self._read_manifest()]
+        listed = [path for path in listed if path in files]
+        unlisted = sorted(set(files) - set(listed), key=os.path.getmtime, reverse=True)
+        return listed + unlisted
+
+    def load(self) -> List[Dict]:
+        bundles = []
+        for path in self.paths():
+            try:
+                with open(path, "rb") as f:
+                    bundles.append(json.loads(f.read()))
+            except (OSError, ValueError) as e:
+                print(f"Error reading bundle {path}: {e}")
+        return bundles
+
+
+# (body, gzipped body, strong ETag)
+Prepared = Tuple[bytes, bytes, str]
+
+
+def prepare(value: Dict, etag: str) -> Prepared:
+    body = _dumps(value)
+    return body, gzip.compress(body, mtime=0), f'"{etag}"'
+
+
+class AnswerBundleService:
+    """
+    Serves the current bundle and deltas from retained versions, all precomputed
+    """
+
+    def __init__(self, loader: DataLoader, store: BundleStore):
+        self.bundle = build_bundle(loader)
+        self.version = self.bundle["version"]
+        self.current = prepare(self.bundle, self.version)
+        self.deltas: Dict[str, Prepared] = {}
+        # Clients already on the current version get an empty delta
+        self.empty_delta = prepare(diff_bundles(self.bundle, self.bundle), f"{self.version}-{self.version}")
+        for old in store.load():
+            if old.get("version") != self.version and old.get("format") == BUNDLE_FORMAT:
+                self.deltas[old["version"]] = prepare(diff_bundles(old, self.bundle), f"{old['version']}-{self.version}")
+        print(f"Answer bundle {self.version}: {len(self.current[0])} bytes "
+              f"({len(self.current[1])} gzipped), deltas from {len(self.deltas)} earlier versions")
+
+    def info(self) -> Dict:
+        return {
+            "version": self.version,
+            "format": BUNDLE_FORMAT,
+            "bytes": len(self.current[0]),
+            "gzip_bytes": len(self.current[1]),
+            "lines": len(self.bundle["lines"]),
+            "items": len(self.bundle["items"]),
+            "delta_from": sorted(self.deltas),
+        }
+
+    def get_delta(self, from_version: str) -> Optional[Prepared]:
+        """Delta from a retained version (empty from the current one), or None if that version is unknown"""
+        if from_version == self.version:
+            return self.empty_delta
+        return self.deltas.get(from_version)
+
+
+# Global instance
+answer_bundle_service = AnswerBundleService(data_loader, BundleStore(settings.BUNDLE_DIR, settings.BUNDLE_KEEP))
+
+
+if __name__ == "__main__":
+    path = BundleStore(settings.BUNDLE_DIR, settings.BUNDLE_KEEP).save(answer_bundle_service.bundle)
+    print(json.dumps({**answer_bundle_service.info(), "path": path}, indent=2))
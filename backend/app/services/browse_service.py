@@ -0,0 +1,171 @@
+"""
+Catalog browse service for Sabi Market
+Serves aisles, lines per aisle, line details and items with line counts from
+the catalog's secondary indexes. Every record is serialized once at startup;
+pages are joined from those bytes, and pages at the default size are fully
+precomputed along with a strong ETag so repeat requests cost a dict lookup.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from .cache import get_cache
+from .data_loader import DataLoader, data_loader
+
+
+# (serialized JSON body, strong ETag)
+Prepared = Tuple[bytes, str]
+
+
+class BrowseError(ValueError):
+    """Bad cursor or page size"""
+
+
+def _dumps(value) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def prepare(body: bytes) -> Prepared:
+    return body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    """Opaque cursor -> offset; no cursor means the first page"""
+    if not cursor:
+        return 0
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, _, offset = raw.partition(":")
+        if prefix != "o" or not offset.isdigit():
+            raise ValueError(raw)
+        return int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise BrowseError(f"Invalid cursor: {cursor}")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison, so W/"x" matches "x" """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class PagedList:
+    """
+    A list of pre-serialized records served in cursor-paginated pages
+    """
+
+    def __init__(self, key: str, records: List[bytes], page_size: int):
+        self.key = key
+        self.records = records
+        self.page_size = page_size
+        self.pages: Dict[int, Prepared] = {
+            offset: self._render(offset, page_size) for offset in range(0, max(len(records), 1), page_size)
+        }
+
+    def _render(self, offset: int, limit: int) -> Prepared:
+        end = offset + limit
+        next_cursor = encode_cursor(end) if end < len(self.records) else None
+        body = b"".join((
+            b'{"items":[', b",".join(self.records[offset:end]),
+            b'],"next_cursor":', _dumps(next_cursor),
+            b',"total":', str(len(self.records)).encode(), b"}",
+        ))
+        return prepare(body)
+
+    def page(self, cursor: Optional[str], limit: Optional[int]) -> Prepared:
+        offset = decode_cursor(cursor)
+        if limit is None:
+            limit = self.page_size
+        if not 1 <= limit <= settings.BROWSE_MAX_PAGE_SIZE:
+            raise BrowseError(f"limit must be between 1 and {settings.BROWSE_MAX_PAGE_SIZE}")
+        if offset and offset >= len(self.records):
+            raise BrowseError(f"Invalid cursor: {cursor}")
+
+        if limit == self.page_size and offset in self.pages:
+            return self.pages[offset]
+        # Other page sizes and offsets are rendered once and kept in the LRU
+        cache = get_cache("browse")
+        cache_key = (self.key, offset, limit)
+        prepared = cache.get(cache_key)
+        if prepared is None:
+            prepared = self._render(offset, limit)
+            cache.set(cache_key, prepared)
+        return prepared
+
+
+class BrowseService:
+    """
+    Precomputed, paginated views over the catalog
+    """
+
+    def __init__(self, loader: DataLoader, page_size: int = settings.BROWSE_PAGE_SIZE):
+        catalog = loader.catalog
+        self.page_size = page_size
+
+        self.lines: Dict[str, Prepared] = {}
+        summaries: Dict[str, bytes] = {}
+        for line in catalog:
+            direction = loader.get_direction(line)
+            summary = {
+                "line_id": line["line_id"],
+                "line_name": line["line_name"],
+                "aisle": line["aisle"],
+                "order": line["order"],
+                "direction": direction,
+            }
+            summaries[line["line_id"]] = _dumps(summary)
+            self.lines[line["line_id"]] = prepare(_dumps({
+                **summary,
+                "items_sold": list(line["items_sold"]),
+                "position": line["position"],
+                "image_url": loader.get_image_url(line["line_id"]),
+            }))
+
+        self.aisles = prepare(_dumps({"aisles": [
+            {"aisle": aisle, "line_count": len(rows)}
+            for aisle, rows in sorted(catalog.rows_by_aisle.items())
+        ]}))
+        self.aisle_lines: Dict[int, PagedList] = {
+            aisle: PagedList(f"aisle:{aisle}", [summaries[catalog.line_ids[row]] for row in rows], page_size)
+            for aisle, rows in catalog.rows_by_aisle.items()
+        }
+        self.items = PagedList(
+            "items",
+            [_dumps({"item": item, "line_count": len(rows)}) for item, rows in sorted(catalog.rows_by_item.items())],
+            page_size,
+        )
+        print(f"Browse: {len(self.lines)} lines, {len(self.aisle_lines)} aisles, "
+              f"{len(self.items.records)} items precomputed")
+
+    def get_aisles(self) -> Prepared:
+        return self.aisles
+
+    def get_aisle_lines(self, aisle: int, cursor: Optional[str] = None,
+                        limit: Optional[int] = None) -> Optional[Prepared]:
+        """A page of an aisle's lines in walking order, or None for an unknown aisle"""
+        lines = self.aisle_lines.get(aisle)
+        return lines.page(cursor, limit) if lines else None
+
+    def get_line(self, line_id: str) -> Optional[Prepared]:
+        return self.lines.get(line_id)
+
+    def get_items(self, cursor: Optional[str] = None, limit: Optional[int] = None) -> Prepared:
+        """A page of distinct items (lowercased, alphabetical) with how many lines sell each"""
+        return self.items.page(cursor, limit)
+
+
+# Global instance
+browse_service = BrowseService(data_loader)
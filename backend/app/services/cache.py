@@ -0,0 +1,239 @@
+"""
+Result caches for Sabi Market
+Small thread-safe LRU caches with a TTL for routing, navigation and info
+results, with hit/miss counters exposed in /metrics. With SHARED_CACHE_PATH
+set, the caches named in SHARED_CACHES also read and write a SQLite (WAL)
+database shared by every worker process.
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple, Union
+
+from app.core.config import settings
+
+
+_MISSING = object()
+
+
+def normalize_query(message: str) -> str:
+    """Lowercase, collapse whitespace and trim punctuation so near-identical queries share work"""
+    return " ".join(message.lower().split()).strip(" ?!.,")
+
+
+class ResultCache:
+    """
+    LRU cache with per-entry expiry
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING or entry[0] < time.monotonic():
+                if entry is not _MISSING:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            return entry is not _MISSING and entry[0] >= time.monotonic()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class SharedCache:
+    """
+    Cross-process cache in a SQLite database in WAL mode
+
+    Each thread of each process opens its own connection (reopened after a
+    fork). Values are pickled; keys are stored by repr(), which is stable for
+    the str/tuple keys the services use. Expired and excess entries are pruned
+    every `prune_every` writes.
+    """
+
+    def __init__(self, name: str, path: str, max_entries: int, ttl: float, prune_every: int = 256):
+        self.name = name
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.prune_every = prune_every
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._writes = 0
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries (cache TEXT, key TEXT, value BLOB, expires REAL, "
+                "PRIMARY KEY (cache, key)) WITHOUT ROWID"
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            row = self._connection().execute(
+                "SELECT value FROM entries WHERE cache = ? AND key = ? AND expires >= ?",
+                (self.name, repr(key), time.time()),
+            ).fetchone()
+        except sqlite3.Error as e:
+            self.errors += 1
+            print(f"Shared cache '{self.name}' read failed: {e}")
+            row = None
+        if row is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return pickle.loads(row[0])
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        try:
+            connection = self._connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO entries (cache, key, value, expires) VALUES (?, ?, ?, ?)",
+                (self.name, repr(key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), expires),
+            )
+            self._writes += 1
+            if self._writes % self.prune_every == 0:
+                self._prune(connection)
+        except sqlite3.Error as e:
+            self.errors += 1
+            print(f"Shared cache '{self.name}' write failed: {e}")
+
+    def _prune(self, connection: sqlite3.Connection):
+        """Drop expired entries, then the ones closest to expiry beyond max_entries"""
+        connection.execute("DELETE FROM entries WHERE cache = ? AND expires < ?", (self.name, time.time()))
+        connection.execute(
+            "DELETE FROM entries WHERE cache = ? AND key IN (SELECT key FROM entries WHERE cache = ? "
+            "ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+            (self.name, self.name, self.max_entries),
+        )
+
+    def __contains__(self, key: Hashable) -> bool:
+        row = self._connection().execute(
+            "SELECT 1 FROM entries WHERE cache = ? AND key = ? AND expires >= ?",
+            (self.name, repr(key), time.time()),
+        ).fetchone()
+        return row is not None
+
+    def clear(self):
+        self._connection().execute("DELETE FROM entries WHERE cache = ?", (self.name,))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class TieredCache:
+    """
+    In-process LRU in front of a SharedCache; same interface as ResultCache
+    """
+
+    def __init__(self, local: ResultCache, shared: SharedCache):
+        self.name = local.name
+        self.local = local
+        self.shared = shared
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = self.shared.get(key, _MISSING)
+        if value is _MISSING:
+            return default
+        # Another worker computed it; keep a local copy
+        self.local.set(key, value)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        self.local.set(key, value, ttl)
+        self.shared.set(key, value, ttl)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.local or key in self.shared
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.local.stats()
+        lookups = stats["hits"] + stats["misses"]
+        stats["shared"] = self.shared.stats()
+        # Overall: answered from either tier
+        stats["hit_rate"] = round((stats["hits"] + self.shared.hits) / lookups, 3) if lookups else 0.0
+        return stats
+
+
+_caches: Dict[str, Union[ResultCache, TieredCache]] = {}
+
+
+def get_cache(name: str) -> Union[ResultCache, TieredCache]:
+    """Named cache shared by every user of the same name in this process (and across workers if configured)"""
+    cache = _caches.get(name)
+    if cache is None:
+        cache = ResultCache(name, settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS)
+        shared_names = {n.strip() for n in settings.SHARED_CACHES.split(",")}
+        if settings.SHARED_CACHE_PATH and name in shared_names:
+            shared = SharedCache(name, settings.SHARED_CACHE_PATH,
+                                 settings.SHARED_CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS)
+            cache = TieredCache(cache, shared)
+        _caches[name] = cache
+    return cache
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in _caches.items()}
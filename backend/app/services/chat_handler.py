@@ -1,22 +1,121 @@
+import asyncio
 from .router_service import router_service
 from .data_loader import data_loader
 from .info_service import info_service
-from typing import Dict
+from .navigation_service import navigation_service
+from .cache import normalize_query
+from .profiler import to_thread
+from app.core.config import settings
+from typing import Dict, List, Optional, Tuple
 
 
-def get_intent_and_execute(message: str) -> Dict[str, str]:
-    return execute(router_service.route(message))
+def get_intent_and_execute(message: str, origin: Optional[Tuple[float, float]] = None) -> Dict[str, str]:
+    return execute(router_service.route(message), origin)
 
 
-def execute(router_info: dict) -> dict:
+def execute(router_info: dict, origin: Optional[Tuple[float, float]] = None) -> dict:
     action = router_info.get("action")
     if action == "search":
-        # Perform search action
+        # Perform search action, starting from the user's map position if known
         query = router_info.get("query", "")
-        return data_loader.search_products(query)
+        return data_loader.search_products(query, origin=origin)
     elif action == "info":
         topic = router_info.get("original_message", "")
         answer = info_service.search(topic)
         return {"info": answer}
 
+
+async def execute_batch(messages: List[str], origin: Optional[Tuple[float, float]] = None,
+                        concurrency: int = settings.BATCH_CONCURRENCY) -> List[Dict]:
+    """
+    Answer many chat messages with grouped outbound calls.
+
+    Messages are deduplicated after normalization; the first spelling of each
+    is what gets routed, as /chat would route it. With an origin map position
+    every search picks the nearest matching line and directions start there,
+    as in /chat. Routing and keyword
+    extraction take one LLM call each for the whole batch, catalog lookups
+    take one pass over the lines, and navigation/info calls fan out with at
+    most `concurrency` in flight.
+
+    Returns:
+        One result per input message, in order: the same shape as execute(),
+        or {"error": ...} if that message failed.
+    """
+    originals: Dict[str, str] = {}  # normalized -> first message as typed
+    for message in messages:
+        originals.setdefault(normalize_query(message), message)
+    unique = list(originals)
+    results: Dict[str, Dict] = {}
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def bounded(fn, *args, **kwargs):
+        async with semaphore:
+            return await to_thread(fn, *args, **kwargs)
+
+    try:
+        routes = await to_thread(router_service.route_batch, list(originals.values()))
+    except Exception as e:
+        return [{"error": f"Routing failed: {e}"} for _ in messages]
+
+    # Search: local fuzzy lookup, one grouped keyword call for the rest, one pass over the catalog
+    searches = {query: route.get("query", "") for query, route in zip(unique, routes) if route.get("action") == "search"}
+    search_queries = list(dict.fromkeys(searches.values()))
+    try:
+        keywords = await to_thread(data_loader.extract_keywords, search_queries)
+        keyword_by_query = {query: keyword.lower() for query, keyword in zip(search_queries, keywords)}
+        distinct_keywords = list(dict.fromkeys(keyword_by_query.values()))
+        if origin is None:
+            lines = data_loader.search_lines_batch(distinct_keywords)
+        else:
+            lines = [next(iter(data_loader.nearest_lines(origin[0], origin[1], keyword=keyword, k=1)), None)
+                     for keyword in distinct_keywords]
+        line_by_keyword = dict(zip(distinct_keywords, lines))
+    except Exception as e:
+        line_by_keyword = {}
+        for query in searches:
+            results[query] = {"error": f"Search failed: {e}"}
+
+    # Navigation: one call per distinct (line, matched term)
+    navigation_jobs: Dict[Tuple[str, str], Dict] = {}
+    for query, search_query in searches.items():
+        if query in results:
+            continue
+        line = line_by_keyword.get(keyword_by_query.get(search_query, ""))
+        if line is None:
+            results[query] = {"direction": "", "name": ""}
+        else:
+            navigation_jobs.setdefault((line["line_id"], line["matched_term"]), line)
+
+    # Info: one call per distinct topic
+    info_topics = list(dict.fromkeys(
+        route.get("original_message", "") for route in routes if route.get("action") != "search"
+    ))
+
+    start = data_loader.describe_position(*origin) if origin is not None else None
+    jobs = [bounded(navigation_service.navigate, line, start=start) for line in navigation_jobs.values()]
+    jobs += [bounded(info_service.search, topic) for topic in info_topics]
+    outcomes = await asyncio.gather(*jobs, return_exceptions=True)
+    directions = dict(zip(navigation_jobs, outcomes[:len(navigation_jobs)]))
+    answers = dict(zip(info_topics, outcomes[len(navigation_jobs):]))
+
+    for query, route in zip(unique, routes):
+        if query in results:
+            continue
+        if route.get("action") == "search":
+            line = line_by_keyword[keyword_by_query[searches[query]]]
+            direction = directions[(line["line_id"], line["matched_term"])]
+            if isinstance(direction, Exception):
+                results[query] = {"error": f"Navigation failed: {direction}"}
+            else:
+                results[query] = {"direction": direction, "name": line["line_name"][:-4].strip(), "line_id": line["line_id"]}
+        else:
+            answer = answers[route.get("original_message", "")]
+            if isinstance(answer, Exception):
+                results[query] = {"error": f"Info search failed: {answer}"}
+            else:
+                results[query] = {"info": answer}
+
+    return [results[normalize_query(message)] for message in messages]
+
 # get_intent("Where can I get an umbrella?")
\ No newline at end of file
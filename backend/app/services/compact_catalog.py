@@ -0,0 +1,271 @@
+"""
+Compact in-memory catalog for Sabi Market
+Stores lines as a struct of arrays: aisle/order/position columns in typed
+arrays, items as integer IDs into one interned vocabulary (CSR layout per
+line), and item -> line postings as integer arrays. Lines and search hits
+are exposed through small __slots__ views instead of per-line dicts.
+"""
+
+import math
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+LINE_KEYS = ("line_id", "line_name", "aisle", "items_sold", "order", "position")
+
+
+class LineView(Mapping):
+    """
+    Read-only dict-like view of one catalog line
+
+    Behaves like the enriched line dicts DataLoader used to build
+    (``line["aisle"]``, ``line.get("items_sold")``, ``{**line}``) while
+    holding only a reference to the catalog and a row number.
+    """
+
+    __slots__ = ("_catalog", "_index")
+
+    def __init__(self, catalog: "CompactCatalog", index: int):
+        self._catalog = catalog
+        self._index = index
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    def __getitem__(self, key):
+        catalog, index = self._catalog, self._index
+        if key == "line_id":
+            return catalog.line_ids[index]
+        if key == "line_name":
+            return catalog.line_names[index]
+        if key == "aisle":
+            return catalog.aisles[index]
+        if key == "order":
+            return catalog.orders[index]
+        if key == "items_sold":
+            return catalog.items_of(index)
+        if key == "position":
+            return catalog.position_of(index)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(LINE_KEYS)
+
+    def __len__(self) -> int:
+        return len(LINE_KEYS)
+
+    def __repr__(self) -> str:
+        return f"LineView({dict(self)!r})"
+
+
+class MatchView(Mapping):
+    """
+    A search hit: a line view plus match details, without copying the line
+    """
+
+    __slots__ = ("line", "match_type", "matched_term", "direction", "distance")
+
+    _EXTRA_KEYS = ("match_type", "matched_term", "direction", "distance")
+
+    def __init__(self, line: LineView, match_type: str, matched_term: Optional[str],
+                 direction: str, distance: Optional[float] = None):
+        self.line = line
+        self.match_type = match_type
+        self.matched_term = matched_term
+        self.direction = direction
+        self.distance = distance
+
+    def __getitem__(self, key):
+        if key in self._EXTRA_KEYS:
+            value = getattr(self, key)
+            if value is None and key == "distance":
+                raise KeyError(key)
+            return value
+        return self.line[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from LINE_KEYS
+        yield from ("match_type", "matched_term", "direction")
+        if self.distance is not None:
+            yield "distance"
+
+    def __len__(self) -> int:
+        return len(LINE_KEYS) + 3 + (self.distance is not None)
+
+    def __repr__(self) -> str:
+        return f"MatchView({dict(self)!r})"
+
+
+class CompactCatalog:
+    """
+    Struct-of-arrays catalog, rows sorted by (aisle, order)
+
+    Also usable as a sequence of LineView rows, so it can stand in for the
+    old ``List[Dict]`` of lines.
+    """
+
+    def __init__(self):
+        self.line_ids: List[str] = []
+        self.line_names: List[str] = []
+        self.line_names_lower: List[str] = []
+        self.aisles = array("i")
+        self.orders = array("i")
+        self.xs = array("d")  # NaN when the line has no map position
+        self.ys = array("d")
+
+        self.vocab: List[str] = []  # interned item strings
+        self.vocab_lower: List[str] = []
+        self.vocab_ids: Dict[str, int] = {}
+        self.item_offsets = array("I", [0])  # line i's items are item_ids[offsets[i]:offsets[i + 1]]
+        self.item_ids = array("I")
+        self.postings: Dict[int, array] = {}  # item ID -> line rows, ascending
+
+        # Secondary indexes, built once after loading
+        self.rows_by_id: Dict[str, int] = {}
+        self.rows_by_aisle: Dict[int, array] = {}  # aisle -> rows ordered by position
+        self.rows_by_name: Dict[str, int] = {}  # lowercase line name -> row
+        self.rows_by_item: Dict[str, array] = {}  # lowercase item -> rows, ascending
+
+    @classmethod
+    def from_market_data(cls, market_data: Dict[str, Dict]) -> "CompactCatalog":
+        """Build from the flat ``{line_id: {...}}`` structure of marketway.json"""
+        catalog = cls()
+        rows = sorted(
+            market_data.items(),
+            key=lambda pair: (pair[1].get("aisle", 0), pair[1].get("order", 999)),
+        )
+        for row, (line_id, line_data) in enumerate(rows):
+            line_name = sys.intern(line_data.get("line_name", ""))
+            catalog.line_ids.append(sys.intern(line_id))
+            catalog.line_names.append(line_name)
+            catalog.line_names_lower.append(sys.intern(line_name.lower()))
+            catalog.aisles.append(line_data.get("aisle", 0))
+            catalog.orders.append(line_data.get("order", 999))
+            position = line_data.get("position")
+            catalog.xs.append(position["x"] if position else math.nan)
+            catalog.ys.append(position["y"] if position else math.nan)
+
+            for item in line_data.get("items_sold", []):
+                item_id = catalog._intern_item(item)
+                catalog.item_ids.append(item_id)
+                postings = catalog.postings.get(item_id)
+                if postings is None:
+                    catalog.postings[item_id] = array("I", (row,))
+                elif postings[-1] != row:
+                    postings.append(row)
+            catalog.item_offsets.append(len(catalog.item_ids))
+            catalog.rows_by_id[catalog.line_ids[row]] = row
+        catalog._build_indexes()
+        return catalog
+
+    def _build_indexes(self):
+        for row, aisle in enumerate(self.aisles):
+            # Rows are already sorted by (aisle, order)
+            self.rows_by_aisle.setdefault(aisle, array("I")).append(row)
+        for row, name in enumerate(self.line_names_lower):
+            self.rows_by_name.setdefault(name, row)
+
+        item_ids_by_term: Dict[str, List[int]] = {}
+        for item_id, term in enumerate(self.vocab_lower):
+            item_ids_by_term.setdefault(term, []).append(item_id)
+        for term, item_ids in item_ids_by_term.items():
+            if len(item_ids) == 1:
+                # Share the postings array rather than copying it
+                self.rows_by_item[term] = self.postings[item_ids[0]]
+            else:
+                rows = set()
+                for item_id in item_ids:
+                    rows.update(self.postings[item_id])
+                self.rows_by_item[term] = array("I", sorted(rows))
+
+    def _intern_item(self, item: str) -> int:
+        item_id = self.vocab_ids.get(item)
+        if item_id is None:
+            item_id = len(self.vocab)
+            item = sys.intern(item)
+            self.vocab.append(item)
+            self.vocab_lower.append(sys.intern(item.lower()))
+            self.vocab_ids[item] = item_id
+        return item_id
+
+    # Sequence of LineView rows
+
+    def __len__(self) -> int:
+        return len(self.line_ids)
+
+    def __getitem__(self, row: int) -> LineView:
+        if row < 0:
+            row += len(self.line_ids)
+        if not 0 <= row < len(self.line_ids):
+            raise IndexError(row)
+        return LineView(self, row)
+
+    def __iter__(self) -> Iterator[LineView]:
+        for row in range(len(self.line_ids)):
+            yield LineView(self, row)
+
+    # Column accessors
+
+    def by_id(self, line_id: str) -> Optional[LineView]:
+        row = self.rows_by_id.get(line_id)
+        return None if row is None else LineView(self, row)
+
+    def item_ids_of(self, row: int) -> array:
+        return self.item_ids[self.item_offsets[row]:self.item_offsets[row + 1]]
+
+    def items_of(self, row: int) -> Tuple[str, ...]:
+        vocab = self.vocab
+        return tuple(vocab[item_id] for item_id in self.item_ids_of(row))
+
+    def position_of(self, row: int) -> Optional[Dict[str, float]]:
+        x, y = self.xs[row], self.ys[row]
+        if math.isnan(x):
+            return None
+        return {"x": x, "y": y}
+
+    # Lookups
+
+    def matching_item_ids(self, keyword: str) -> List[int]:
+        """Vocabulary IDs whose lowercase text contains the keyword"""
+        return [item_id for item_id, term in enumerate(self.vocab_lower) if keyword in term]
+
+    def find(self, keyword: str, first_only: bool = True) -> List[Tuple[int, str, str]]:
+        """
+        Lines whose name or items contain `keyword`, in catalog order
+
+        Scans the vocabulary (distinct items) rather than every item of every
+        line, then walks the postings of matching items.
+
+        Returns:
+            (row, match_type, matched_term) triples. A name match wins over
+            item matches; for item matches every matching item of the line is
+            listed in line order, comma separated.
+        """
+        keyword = keyword.lower()
+        matched_items = set(self.matching_item_ids(keyword))
+
+        if first_only:
+            # Postings are ascending, so each item's first row is its earliest line
+            candidates = [self.postings[item_id][0] for item_id in matched_items]
+            name_row = next((row for row, name in enumerate(self.line_names_lower) if keyword in name), None)
+            if name_row is not None:
+                candidates.append(name_row)
+            rows = [min(candidates)] if candidates else []
+        else:
+            row_set = set()
+            for item_id in matched_items:
+                row_set.update(self.postings[item_id])
+            row_set.update(row for row, name in enumerate(self.line_names_lower) if keyword in name)
+            rows = sorted(row_set)
+
+        results = []
+        for row in rows:
+            if keyword in self.line_names_lower[row]:
+                results.append((row, "line_name", self.line_names[row]))
+            else:
+                terms = [self.vocab[item_id] for item_id in self.item_ids_of(row) if item_id in matched_items]
+                results.append((row, "item", terms[0] if first_only else ", ".join(dict.fromkeys(terms))))
+        return results
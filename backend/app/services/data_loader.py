@@ -1,17 +1,40 @@
 import json
 import os
-from typing import Dict, List, Optional
+from urllib.parse import quote
+from typing import Dict, List, Optional, Tuple
 from pypdf import PdfReader
 from app.core.config import settings
+from .compact_catalog import CompactCatalog, LineView, MatchView
 from .llm_service import llm_service
 from .navigation_service import navigation_service
+from .spatial_index import SpatialIndex
+from .spell_index import SpellIndex, singular, tokenize
+
+# Route from the main gate into each aisle, and the side its lines are on (the layout in the navigation prompts)
+AISLE_ROUTES: Dict[int, Tuple[str, str]] = {
+    1: ("Enter through the main gate and walk straight down aisle 1", "RIGHT"),
+    2: ("Enter through the main gate, make the first left turn, then the next right turn into aisle 2", "LEFT"),
+}
+
+ORDINALS = ["first", "second", "third", "fourth", "fifth", "sixth", "seventh", "eighth", "ninth", "tenth"]
+
+
+def ordinal(n: int) -> str:
+    """1 -> "first", 12 -> "12th", 23 -> "23rd" """
+    if 1 <= n <= len(ORDINALS):
+        return ORDINALS[n - 1]
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
 
 class DataLoader:
     def __init__(self):
-        self.market_data: Dict = {}
         self.history_text: str = ""
-        self.lines: List[Dict] = []
-        self.lines_by_id: Dict[str, Dict] = {}  # Fast lookup by line ID
+        self.catalog: CompactCatalog = CompactCatalog()
+        self.lines: CompactCatalog = self.catalog  # Sequence of line views sorted by aisle and order
+        self.spatial_index: SpatialIndex = SpatialIndex({}, {})
+        self.images: Dict[str, str] = {}  # line ID -> image filename in IMAGES_DIR
+        self.spell_index: SpellIndex = SpellIndex()
         self._load_data()
 
     def _load_data(self):
@@ -20,36 +43,26 @@ class DataLoader:
         if os.path.exists(settings.JSON_PATH):
             try:
                 with open(settings.JSON_PATH, 'r') as f:
-                    self.market_data = json.load(f)
-                    print(f"Loaded market data: {len(self.market_data)} lines")
-
-                    # Process flat structure where each key is a line ID
-                    self.lines = []
-                    self.lines_by_id = {}
-                    
-                    for line_id, line_data in self.market_data.items():
-                        # Enrich line data with the line_id for easy reference
-                        enriched_line = {
-                            "line_id": line_id,
-                            "line_name": line_data.get("line_name", ""),
-                            "aisle": line_data.get("aisle", 0),
-                            "items_sold": line_data.get("items_sold", []),
-                            "order": line_data.get("order", 999)
-                        }
-                        
-                        self.lines.append(enriched_line)
-                        self.lines_by_id[line_id] = enriched_line
-
-                    # Sort lines by aisle first, then by order within aisle
-                    self.lines.sort(key=lambda x: (x["aisle"], x["order"]))
-                    
-                    print(f"Processed {len(self.lines)} lines across {len(set(l['aisle'] for l in self.lines))} aisles")
+                    market_data = json.load(f)
+                print(f"Loaded market data: {len(market_data)} lines")
+
+                # Flat structure where each key is a line ID; only the compact
+                # columns are kept, the parsed JSON is released afterwards
+                self.catalog = CompactCatalog.from_market_data(market_data)
+                self.lines = self.catalog
+                del market_data
+
+                print(f"Processed {len(self.catalog)} lines across {len(set(self.catalog.aisles))} aisles, "
+                      f"{len(self.catalog.item_ids)} items ({len(self.catalog.vocab)} distinct)")
+
+                self._build_spatial_index()
+                self._build_spell_index()
+                self._match_images()
 
             except Exception as e:
                 print(f"Error loading JSON: {e}")
-                self.market_data = {}
-                self.lines = []
-                self.lines_by_id = {}
+                self.catalog = CompactCatalog()
+                self.lines = self.catalog
         else:
             print(f"Warning: JSON file not found at {settings.JSON_PATH}")
 
@@ -68,128 +81,261 @@ class DataLoader:
             print(f"Warning: PDF file not found at {settings.PDF_PATH}")
             self.history_text = "History data not available (PDF missing)."
 
-    def get_all_lines(self) -> List[Dict]:
+    def _build_spatial_index(self):
+        """Index every line that has a map position, keyed by its items and name"""
+        catalog = self.catalog
+        positions = {}
+        keys_by_line = {}
+        for row in range(len(catalog)):
+            position = catalog.position_of(row)
+            if not position:
+                continue
+            positions[row] = (position["x"], position["y"])
+            keys_by_line[row] = [catalog.vocab_lower[item_id] for item_id in catalog.item_ids_of(row)]
+            keys_by_line[row].append(catalog.line_names_lower[row])
+        self.spatial_index = SpatialIndex(positions, keys_by_line)
+        print(f"Spatial index built over {len(positions)} positioned lines")
+
+    def _build_spell_index(self):
+        """Index item names and line-name words, with singular forms, for typo-tolerant lookup"""
+        catalog = self.catalog
+        index = SpellIndex()
+        for term, rows in catalog.rows_by_item.items():
+            word = "".join(tokenize(term))  # "drinks(egwine)" -> "drinksegwine"
+            index.add(word, len(rows), term)
+            index.add(singular(word), len(rows), term)
+
+        name_words: Dict[str, int] = {}
+        for name in catalog.line_names_lower:
+            for word in set(tokenize(name)) - {"line"}:
+                name_words[word] = name_words.get(word, 0) + 1
+        for word, count in name_words.items():
+            index.add(word, count)
+        self.spell_index = index
+        print(f"Spell index built over {len(index.words)} spellings, {len(index.deletes)} deletes")
+
+    def resolve_keyword(self, text: str) -> Optional[str]:
+        """Catalog term named in `text`, tolerating typos and split/joined words; None if nothing is close"""
+        suggestion = self.spell_index.lookup_compound(text)
+        return suggestion.term if suggestion else None
+
+    def extract_keyword(self, query: str) -> str:
+        """Search keyword for a query: local fuzzy lookup first, the LLM only when that finds nothing"""
+        keyword = self.resolve_keyword(query)
+        if keyword is not None:
+            return keyword
+        keyword = llm_service.extract_keyword(query=query).lower()
+        # The LLM may still misspell or pluralize differently from the catalog
+        return self.resolve_keyword(keyword) or keyword
+
+    def extract_keywords(self, queries: List[str]) -> List[str]:
+        """extract_keyword for many queries; unresolved ones share one grouped LLM call"""
+        keywords = {query: self.resolve_keyword(query) for query in queries}
+        pending = [query for query, keyword in keywords.items() if keyword is None]
+        if pending:
+            for query, keyword in zip(pending, llm_service.extract_keywords(pending)):
+                keyword = keyword.lower()
+                keywords[query] = self.resolve_keyword(keyword) or keyword
+        return [keywords[query] for query in queries]
+
+    def _match_images(self):
+        """Pair line photos with lines: "godly.jpg" or "Victory line.jpg" -> the line whose name starts with it"""
+        if not os.path.isdir(settings.IMAGES_DIR):
+            return
+        for filename in sorted(os.listdir(settings.IMAGES_DIR)):
+            stem = os.path.splitext(filename)[0].lower().strip()
+            if not stem:
+                continue
+            for row, name in enumerate(self.catalog.line_names_lower):
+                line_id = self.catalog.line_ids[row]
+                if name.startswith(stem) and line_id not in self.images:
+                    self.images[line_id] = filename
+                    break
+        print(f"Matched images for {len(self.images)} lines")
+
+    def _match(self, row: int, match_type: str, matched_term: Optional[str], distance: Optional[float] = None) -> MatchView:
+        """Search hit for a catalog row, as a view rather than a copy of the line"""
+        catalog = self.catalog
+        direction = self._get_direction(catalog.aisles[row], catalog.orders[row])
+        return MatchView(LineView(catalog, row), match_type, matched_term, direction, distance)
+
+    def get_match(self, line_id: str, item: Optional[str] = None) -> Optional[MatchView]:
+        """
+        Search hit for a known line and, optionally, one of its items (case-insensitive).
+        None if the line does not exist or does not sell the item.
+        """
+        row = self.catalog.rows_by_id.get(line_id)
+        if row is None:
+            return None
+        if item is None:
+            return self._match(row, "line_name", self.catalog.line_names[row])
+        term = next((term for term in self.catalog.items_of(row) if term.lower() == item.lower()), None)
+        return None if term is None else self._match(row, "item", term)
+
+    def get_all_lines(self) -> CompactCatalog:
         """Get all lines sorted by aisle and order"""
         return self.lines
 
-    def get_line_by_id(self, line_id: str) -> Optional[Dict]:
+    def get_line_by_id(self, line_id: str) -> Optional[LineView]:
         """Fast lookup by line ID (e.g., 'l1', 'l2', 'li', etc.)"""
-        return self.lines_by_id.get(line_id)
+        return self.catalog.by_id(line_id)
 
-    def get_line_by_name(self, name: str) -> Optional[Dict]:
+    def get_line_by_name(self, name: str) -> Optional[LineView]:
         """Find line by name (case-insensitive)"""
-        name_lower = name.lower()
-        for line in self.lines:
-            if line.get("line_name", "").lower() == name_lower:
-                return line
-        return None
+        row = self.catalog.rows_by_name.get(name.lower())
+        return None if row is None else self.catalog[row]
 
-    def get_lines_by_aisle(self, aisle_number: int) -> List[Dict]:
+    def get_lines_by_aisle(self, aisle_number: int) -> List[LineView]:
         """Get all lines in a specific aisle, sorted by order"""
-        aisle_lines = [line for line in self.lines if line["aisle"] == aisle_number]
-        return sorted(aisle_lines, key=lambda x: x["order"])
+        return [self.catalog[row] for row in self.catalog.rows_by_aisle.get(aisle_number, ())]
+
+    def get_direction(self, line: LineView) -> str:
+        """Aisle/position direction for a line"""
+        return self._get_direction(line["aisle"], line["order"])
+
+    def get_image_url(self, line_id: str) -> Optional[str]:
+        """URL of the line's photo under /images, if there is one"""
+        filename = self.images.get(line_id)
+        return f"/images/{quote(filename)}" if filename else None
+
+    def get_line_position(self, line_id: str) -> Optional[Tuple[float, float]]:
+        """Map position of a line, e.g. from a QR code scanned at one of its stalls"""
+        row = self.catalog.rows_by_id.get(line_id)
+        if row is None:
+            return None
+        position = self.catalog.position_of(row)
+        return (position["x"], position["y"]) if position else None
 
-    def search_products(self, query: str) -> dict:
+    def nearest_lines(self, x: float, y: float, keyword: Optional[str] = None, k: int = 5) -> List[MatchView]:
+        """
+        Find the k lines closest to a map position.
+        With a keyword, only lines whose name or items contain it are considered.
+        """
+        keys = None
+        if keyword:
+            keyword = keyword.lower()
+            if keyword in self.spatial_index.by_item:
+                keys = [keyword]
+            else:
+                keys = [key for key in self.spatial_index.by_item if keyword in key]
+
+        catalog = self.catalog
+        results = []
+        for distance, row in self.spatial_index.nearest(x, y, k, items=keys):
+            match_type, matched_term = "nearby", None
+            if keyword:
+                if keyword in catalog.line_names_lower[row]:
+                    match_type, matched_term = "line_name", catalog.line_names[row]
+                else:
+                    match_type = "item"
+                    matched_term = next(
+                        catalog.vocab[item_id] for item_id in catalog.item_ids_of(row)
+                        if keyword in catalog.vocab_lower[item_id]
+                    )
+            results.append(self._match(row, match_type, matched_term, round(distance, 1)))
+        return results
+
+    def describe_position(self, x: float, y: float) -> str:
+        """Describe a map position by the line the user is standing next to"""
+        nearest = self.nearest_lines(x, y, k=1)
+        if not nearest:
+            return "the main gate"
+        line = nearest[0]
+        return f"standing next to {line['line_name']} ({line['direction']})"
+
+    def search_products(self, query: str, origin: Optional[Tuple[float, float]] = None) -> dict:
         """
         Search for products across all lines.
         Returns matching lines with directions based on aisle and order.
+        With an origin map position, the nearest matching line is chosen and
+        directions start from that position instead of the main gate.
         """
-        results = []
-        
-        # Extract keyword using LLM
-        keyword = llm_service.extract_keyword(query=query).lower()
+        keyword = self.extract_keyword(query)
         print(f"Search keyword: '{keyword}'")
-        
-        for line in self.lines:
-            line_name = line.get("line_name", "")
-            items = line.get("items_sold", [])
-            aisle = line.get("aisle", 0)
-            order = line.get("order", 0)
-
-            # Check if keyword matches line name
-            if keyword in line_name.lower():
-                results.append({
-                    **line,
-                    "match_type": "line_name",
-                    "matched_term": line_name,
-                    "direction": self._get_direction(aisle, order)
-                })
-                break
-
-            # Check if keyword matches any item
-            for item in items:
-                if keyword in item.lower():
-                    results.append({
-                        **line,
-                        "match_type": "item",
-                        "matched_term": item,
-                        "direction": self._get_direction(aisle, order)
-                    })
-                    break  # Only add line once even if multiple items match
-            
-            # Stop after first match for faster results
-            if len(results) > 0:
-                break
-        
-        direction = navigation_service.navigate(results[0]) if results else ""
-
-        return {"direction": direction, "name": line_name[:-4].strip()} 
-
-    def search_products_all_matches(self, query: str) -> List[Dict]:
+
+        start = None
+        if origin is not None:
+            results = self.nearest_lines(origin[0], origin[1], keyword=keyword, k=1)
+            start = self.describe_position(*origin)
+        else:
+            # First matching line in aisle/order, name matches before item matches
+            results = [self._match(*hit) for hit in self.catalog.find(keyword)]
+
+        if not results:
+            return {"direction": "", "name": ""}
+
+        direction = navigation_service.navigate(results[0], start=start)
+        return {"direction": direction, "name": results[0]["line_name"][:-4].strip(), "line_id": results[0]["line_id"]}
+
+    def search_lines_batch(self, keywords: List[str]) -> List[Optional[MatchView]]:
+        """
+        Resolve many keywords in a single pass over the item vocabulary and line names.
+        Each keyword gets the same first match search_products would pick, or None.
+        """
+        catalog = self.catalog
+        pending = list(dict.fromkeys(keyword.lower() for keyword in keywords))
+        first_row: Dict[str, int] = {}
+        matched_items: Dict[str, set] = {keyword: set() for keyword in pending}
+
+        for item_id, term in enumerate(catalog.vocab_lower):
+            for keyword in pending:
+                if keyword in term:
+                    matched_items[keyword].add(item_id)
+                    row = catalog.postings[item_id][0]
+                    if row < first_row.get(keyword, len(catalog)):
+                        first_row[keyword] = row
+
+        for row, name in enumerate(catalog.line_names_lower):
+            for keyword in pending:
+                if keyword in name and row < first_row.get(keyword, len(catalog)):
+                    first_row[keyword] = row
+
+        matches: Dict[str, MatchView] = {}
+        for keyword, row in first_row.items():
+            if keyword in catalog.line_names_lower[row]:
+                matches[keyword] = self._match(row, "line_name", catalog.line_names[row])
+            else:
+                item_id = next(i for i in catalog.item_ids_of(row) if i in matched_items[keyword])
+                matches[keyword] = self._match(row, "item", catalog.vocab[item_id])
+
+        return [matches.get(keyword.lower()) for keyword in keywords]
+
+    def search_products_all_matches(self, query: str) -> List[MatchView]:
         """
         Search for products and return ALL matching lines (not just first).
         Useful when user wants to see all options.
         """
-        results = []
-        
-        keyword = llm_service.extract_keyword(query=query).lower()
+        keyword = self.extract_keyword(query)
         print(f"Search keyword (all matches): '{keyword}'")
-        
-        for line in self.lines:
-            line_id = line.get("line_id", "")
-            line_name = line.get("line_name", "")
-            items = line.get("items_sold", [])
-            aisle = line.get("aisle", 0)
-            order = line.get("order", 0)
-
-            # Check line name match
-            if keyword in line_name.lower():
-                results.append({
-                    **line,
-                    "match_type": "line_name",
-                    "matched_term": line_name,
-                    "direction": self._get_direction(aisle, order)
-                })
-                continue
 
-            # Check item matches
-            matched_items = [item for item in items if keyword in item.lower()]
-            if matched_items:
-                results.append({
-                    **line,
-                    "match_type": "item",
-                    "matched_term": ", ".join(matched_items),
-                    "direction": self._get_direction(aisle, order)
-                })
-        
-        return results
+        return [self._match(*hit) for hit in self.catalog.find(keyword, first_only=False)]
 
     def _get_direction(self, aisle: int, order: int) -> str:
         """
         Generate human-readable directions based on aisle and order.
         """
         direction = f"Aisle {aisle}, Position {order}"
-        
-        # Add relative position hints
+        return f"{direction} ({self._position_hint(order)} of aisle {aisle})"
+
+    def _position_hint(self, order: int) -> str:
+        """Relative position of a line within its aisle"""
         if order <= 3:
-            position = "near the beginning"
+            return "near the beginning"
         elif order <= 7:
-            position = "in the middle"
-        else:
-            position = "towards the end"
-        
-        return f"{direction} ({position} of aisle {aisle})"
+            return "in the middle"
+        return "towards the end"
 
+    def get_walking_directions(self, line: LineView) -> str:
+        """
+        Deterministic walking directions from the main gate, without the LLM.
+
+        Follows the market layout: the turn into each aisle from AISLE_ROUTES
+        and the side of the aisle its lines are on.
+        """
+        aisle, order = line["aisle"], line["order"]
+        route, side = AISLE_ROUTES.get(aisle, (f"From the main gate, go to aisle {aisle}", None))
+        place = f"the {ordinal(order)} line on your {side}" if side else f"the {ordinal(order)} line"
+        return f"{route}. {line['line_name']} is {place}, {self._position_hint(order)} of the aisle."
 
     def get_history(self) -> str:
         """Get market history text from PDF"""
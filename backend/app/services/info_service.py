@@ -1,5 +1,6 @@
 from tavily import TavilyClient
 from app.core.config import settings
+from .cache import get_cache, normalize_query
 
 class InfoService:
     def __init__(self):
@@ -9,15 +10,23 @@ class InfoService:
                 self.client = TavilyClient(api_key=settings.TAVILY_API_KEY)
             except Exception as e:
                 print(f"Error initializing Tavily client: {e}")
+        self.cache = get_cache("info")
 
     def search(self, query: str) -> str:
         if not self.client:
             return "Online search is unavailable (API Key missing or invalid)."
         
+        key = normalize_query(query)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
         try:
             # Perform a search optimized for answers
             response = self.client.search(query=query, search_depth="basic", include_answer=True)
-            return response.get("answer", response.get("results", "No results found."))
+            answer = response.get("answer", response.get("results", "No results found."))
+            self.cache.set(key, answer)
+            return answer
         except Exception as e:
             return f"Error performing online search: {str(e)}"
 
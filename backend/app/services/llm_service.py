@@ -1,10 +1,17 @@
+import json
+import re
+from typing import List
 import google.generativeai as genai
 from app.core.config import settings
 from langchain_google_genai import GoogleGenerativeAI
+from .cache import get_cache, normalize_query
+from .prompts import get_template
+from .token_accounting import token_accountant
 
 class LLMService:
     def __init__(self):
         self.model = None
+        self.cache = get_cache("keyword")
         self._initialize()
 
     def _initialize(self):
@@ -25,28 +32,58 @@ class LLMService:
         # if not self.model:
         #     return query
 
+        key = normalize_query(query)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
-            prompt = f"""
-            Extract the single most important product keyword from this query.
-            Query: "{query}"
-            Return ONLY the keyword by category. If it's already a keyword, return it as is.
-            Example: "I need a shoe" -> "shoe"
-            Example: "where can i get some drugs?" -> "pharmacy"
-            Example: "red dress" -> "dress"
-            Example: "I need a trouser" -> "dress"
-            """
-            
-            response = self.model.invoke(prompt)
+            response = token_accountant.invoke(
+                self.model,
+                get_template("keyword", settings.PROMPT_VARIANT),
+                query=query,
+            )
             if response:
                 extracted = response.strip().lower()
                 # Basic validation
                 if len(extracted.split()) < 3:
+                    self.cache.set(key, extracted)
                     return extracted
         except Exception as e:
             print(f"LLM extraction failed: {e}")
         
         return query
 
+    def extract_keywords(self, queries: List[str]) -> List[str]:
+        """Extract keywords for several queries with one LLM call, same order as input"""
+        keywords = {query: self.cache.get(normalize_query(query)) for query in queries}
+        pending = [query for query, keyword in keywords.items() if keyword is None]
+        if not pending:
+            return [keywords[query] for query in queries]
+
+        try:
+            response = token_accountant.invoke(
+                self.model,
+                get_template("keyword_batch", settings.PROMPT_VARIANT),
+                queries=json.dumps(pending),
+            )
+            parsed = json.loads(re.sub(r'```json\s*|\s*```', '', response.strip()))
+            if isinstance(parsed, list) and len(parsed) == len(pending):
+                for query, extracted in zip(pending, parsed):
+                    extracted = str(extracted).strip().lower()
+                    # Same validation as extract_keyword
+                    if extracted and len(extracted.split()) < 3:
+                        self.cache.set(normalize_query(query), extracted)
+                        keywords[query] = extracted
+                    else:
+                        keywords[query] = query
+                return [keywords[query] for query in queries]
+            print(f"LLM batch extraction returned {len(parsed) if isinstance(parsed, list) else 'no'} keywords for {len(pending)} queries")
+        except Exception as e:
+            print(f"LLM batch extraction failed: {e}")
+
+        return [keywords[query] or self.extract_keyword(query) for query in queries]
+
 llm_service = LLMService()
 # print(llm_service.model.invoke("yo"))
 
@@ -0,0 +1,305 @@
+"""
+On-demand profiler for the chat hot path
+Samples the stacks of threads serving selected requests and aggregates them
+into flamegraph-compatible collapsed stacks, with optional tracemalloc
+snapshots of the memory each sampled request leaves allocated.
+
+The event-loop thread is only sampled while the profiled request's own task
+is running on it, so interleaved requests are not charged to it. Blocking
+work a handler offloads with ``to_thread`` below is sampled in the worker
+thread that runs it; work offloaded by other means is not seen.
+"""
+
+import asyncio
+import contextvars
+import functools
+import hmac
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from app.core.config import settings
+
+# Id of the profiled request the current context belongs to, if any
+_current_request: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("profiled_request", default=None)
+_request_ids = itertools.count(1)
+
+
+def _frame_label(code) -> str:
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """
+    Low-overhead statistical profiler
+
+    A background thread wakes every ``interval`` seconds and records the
+    current stack of each thread that is serving a profiled request: worker
+    threads running its offloaded calls, and its event-loop thread while one
+    of its tasks is the one running there. The thread only runs while at
+    least one profiled request is in flight.
+    """
+
+    def __init__(self, enabled: bool = False, token: str = "", sample_rate: float = 0.0,
+                 interval: float = 0.005, trace_allocations: bool = False):
+        self.enabled = enabled
+        self.token = token
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.trace_allocations = trace_allocations
+
+        self.cpu_stacks: Counter = Counter()
+        self.alloc_stacks: Counter = Counter()
+        self.profiled_requests = 0
+        self.samples = 0
+
+        self._lock = threading.Lock()
+        self._active: Dict[int, int] = {}  # thread ident -> profiled calls in flight
+        self._loops: Dict[int, asyncio.AbstractEventLoop] = {}  # thread ident -> its running loop
+        self._tasks: Dict[asyncio.Task, int] = {}  # profiled task -> profiled requests in flight
+        self._tracing = 0
+        self._stop_tracemalloc = False
+        self._sampler: Optional[threading.Thread] = None
+
+    def should_profile(self, header_token: Optional[str] = None) -> bool:
+        """Decide whether a request is profiled: forced by token header or sampled"""
+        if not self.enabled:
+            return False
+        if self._token_matches(header_token):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def is_authorized(self, header_token: Optional[str]) -> bool:
+        return self.enabled and self._token_matches(header_token)
+
+    def _token_matches(self, header_token: Optional[str]) -> bool:
+        """Constant-time token check, so response timing does not leak the token"""
+        if not header_token or not self.token:
+            return False
+        return hmac.compare_digest(header_token.encode("utf-8"), self.token.encode("utf-8"))
+
+    @contextmanager
+    def profile(self):
+        """
+        Profile the request running in the current context for the duration of the block
+
+        Inside a coroutine the current task is profiled; otherwise the current thread.
+        """
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        ident = threading.get_ident()
+        token = _current_request.set(next(_request_ids))
+        self._enter(ident, task, new_request=True)
+        baseline = self._start_tracing()
+        try:
+            yield
+        finally:
+            self._stop_tracing(baseline)
+            self._exit(ident, task)
+            _current_request.reset(token)
+
+    def bind(self, fn: Callable) -> Callable:
+        """
+        Wrap `fn` so the thread that calls it is sampled for the profiled request
+        in the current context. Returns `fn` unchanged outside a profiled request.
+        """
+        if _current_request.get() is None:
+            return fn
+
+        @functools.wraps(fn)
+        def profiled(*args, **kwargs):
+            ident = threading.get_ident()
+            self._enter(ident)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._exit(ident)
+
+        return profiled
+
+    def _enter(self, ident: int, task: Optional[asyncio.Task] = None, new_request: bool = False):
+        with self._lock:
+            if task is None:
+                self._active[ident] = self._active.get(ident, 0) + 1
+            else:
+                self._loops[ident] = task.get_loop()
+                self._tasks[task] = self._tasks.get(task, 0) + 1
+            if new_request:
+                self.profiled_requests += 1
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+                self._sampler.start()
+
+    def _exit(self, ident: int, task: Optional[asyncio.Task] = None):
+        with self._lock:
+            if task is None:
+                remaining = self._active.get(ident, 1) - 1
+                if remaining:
+                    self._active[ident] = remaining
+                else:
+                    self._active.pop(ident, None)
+                return
+            remaining = self._tasks.get(task, 1) - 1
+            if remaining:
+                self._tasks[task] = remaining
+            else:
+                self._tasks.pop(task, None)
+            loop = self._loops.get(ident)
+            if not any(t.get_loop() is loop for t in self._tasks):
+                self._loops.pop(ident, None)
+
+    def _sampled_threads(self):
+        """Threads to sample now: offloaded calls, and loops currently running a profiled task"""
+        idents = set(self._active)
+        for ident, loop in self._loops.items():
+            try:
+                running = asyncio.current_task(loop)
+            except RuntimeError:
+                continue
+            if running is None:
+                continue
+            # Tasks the request spawned inherit its context (readable from Python 3.12)
+            context = running.get_context() if hasattr(running, "get_context") else None
+            if running in self._tasks or (context is not None and context.get(_current_request) is not None):
+                idents.add(ident)
+        return idents
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            with self._lock:
+                if not self._active and not self._loops:
+                    self._sampler = None
+                    return
+                idents = self._sampled_threads()
+            frames = sys._current_frames()
+            stacks = []
+            for ident in idents:
+                if ident == own or ident not in frames:
+                    continue
+                stack = []
+                frame = frames[ident]
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stacks.append(";".join(reversed(stack)))
+            del frames
+            with self._lock:
+                self.cpu_stacks.update(stacks)
+                self.samples += len(stacks)
+            time.sleep(self.interval)
+
+    def _start_tracing(self):
+        if not self.trace_allocations:
+            return None
+        with self._lock:
+            if self._tracing == 0:
+                # Only stop tracing later if it was not already on when we started
+                self._stop_tracemalloc = not tracemalloc.is_tracing()
+                if self._stop_tracemalloc:
+                    tracemalloc.start(25)
+            self._tracing += 1
+        return tracemalloc.take_snapshot()
+
+    def _stop_tracing(self, baseline):
+        if baseline is None:
+            return
+        snapshot = tracemalloc.take_snapshot()
+        growth = Counter()
+        for stat in snapshot.compare_to(baseline, "traceback"):
+            if stat.size_diff <= 0:
+                continue
+            # tracemalloc tracebacks are most recent call first
+            frames = [f"{os.path.basename(frame.filename)}:{frame.lineno}" for frame in stat.traceback]
+            growth[";".join(reversed(frames))] += stat.size_diff
+        with self._lock:
+            self.alloc_stacks.update(growth)
+            self._tracing -= 1
+            if self._tracing == 0 and self._stop_tracemalloc:
+                tracemalloc.stop()
+
+    def collapsed(self, kind: str = "cpu") -> str:
+        """
+        Render aggregated stacks in collapsed format ("a;b;c count" per line),
+        the input format of flamegraph.pl, speedscope and inferno
+        """
+        with self._lock:
+            stacks = (self.alloc_stacks if kind == "alloc" else self.cpu_stacks).most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "enabled": self.enabled,
+                "sample_rate": self.sample_rate,
+                "interval_ms": self.interval * 1000,
+                "trace_allocations": self.trace_allocations,
+                "profiled_requests": self.profiled_requests,
+                "samples": self.samples,
+                "distinct_stacks": len(self.cpu_stacks),
+                "distinct_alloc_stacks": len(self.alloc_stacks),
+            }
+
+    def reset(self):
+        with self._lock:
+            self.cpu_stacks.clear()
+            self.alloc_stacks.clear()
+            self.profiled_requests = 0
+            self.samples = 0
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware that profiles selected HTTP requests
+
+    When profiling is disabled the only cost per request is one attribute check.
+    """
+
+    HEADER = b"x-profile"
+
+    def __init__(self, app, profiler: SamplingProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if not self.profiler.enabled or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        if scope["path"].startswith("/debug/profile"):
+            return await self.app(scope, receive, send)
+
+        header_token = None
+        for name, value in scope.get("headers", ()):
+            if name == self.HEADER:
+                header_token = value.decode("latin-1")
+                break
+
+        if not self.profiler.should_profile(header_token):
+            return await self.app(scope, receive, send)
+
+        with self.profiler.profile():
+            await self.app(scope, receive, send)
+
+
+async def to_thread(fn, *args, **kwargs):
+    """asyncio.to_thread that keeps sampling a profiled request in the worker thread"""
+    return await asyncio.to_thread(profiler.bind(fn), *args, **kwargs)
+
+
+# Global instance
+profiler = SamplingProfiler(
+    enabled=settings.PROFILING_ENABLED,
+    token=settings.PROFILE_TOKEN,
+    sample_rate=settings.PROFILE_SAMPLE_RATE,
+    interval=settings.PROFILE_INTERVAL_MS / 1000,
+    trace_allocations=settings.PROFILE_TRACEMALLOC,
+)
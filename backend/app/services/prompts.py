@@ -0,0 +1,229 @@
+"""
+Prompt templates for Sabi Market LLM calls
+Each template is split into a static prefix (instructions, market geography,
+examples) and a short per-request suffix, so the prefix is byte-identical
+across requests and can be served from the provider's prefix/context cache.
+"""
+
+from typing import Dict
+
+
+class PromptTemplate:
+    """
+    A prompt made of a static prefix and a per-request suffix
+
+    Only the suffix is formatted, so braces in the prefix never need escaping
+    and the prefix stays identical for every request of a stage.
+    """
+
+    def __init__(self, stage: str, variant: str, prefix: str, suffix: str):
+        self.stage = stage
+        self.variant = variant
+        self.prefix = prefix
+        self.suffix = suffix
+
+    def render(self, **values) -> str:
+        """Return the full prompt text for one request"""
+        return self.prefix + self.suffix.format(**values)
+
+
+ROUTER_FULL = PromptTemplate(
+    stage="router",
+    variant="full",
+    prefix="""Analyze the user message and determine if they want to:
+1. SEARCH for a product/item in the market
+2. Get INFO about the market (history, general questions, etc.)
+
+Respond with ONLY a JSON object in this exact format:
+{"action": "search" or "info", "data": "extracted keyword for search OR topic for info"}
+
+Examples:
+- "Where can I find shoes?" -> {"action": "search", "data": "shoes"}
+- "I need pharmacy" -> {"action": "search", "data": "pharmacy"}
+- "Tell me about this market" -> {"action": "info", "data": "market history"}
+- "What is Sabi Market?" -> {"action": "info", "data": "general info"}
+
+Rules:
+- If asking WHERE/FIND/NEED/LOOKING FOR a product -> "search"
+- If asking ABOUT/HISTORY/WHAT IS the market -> "info"
+- Extract only the key product name for search
+- Extract the topic for info queries
+""",
+    suffix="""
+User message: "{message}"
+Response:""",
+)
+
+ROUTER_COMPACT = PromptTemplate(
+    stage="router",
+    variant="compact",
+    prefix="""Classify a market chat message. Reply with JSON only:
+{"action": "search"|"info", "data": "<product keyword>"|"<topic>"}
+search = where/find/need/looking for a product. info = about/history/what is the market.
+"Where can I find shoes?" -> {"action": "search", "data": "shoes"}
+"Tell me about this market" -> {"action": "info", "data": "market history"}
+""",
+    suffix="""Message: "{message}"
+JSON:""",
+)
+
+KEYWORD_FULL = PromptTemplate(
+    stage="keyword",
+    variant="full",
+    prefix="""Extract the single most important product keyword from the query.
+Return ONLY the keyword by category. If it's already a keyword, return it as is.
+Example: "I need a shoe" -> "shoe"
+Example: "where can i get some drugs?" -> "pharmacy"
+Example: "red dress" -> "dress"
+Example: "I need a trouser" -> "dress"
+""",
+    suffix="""
+Query: "{query}"
+Keyword:""",
+)
+
+KEYWORD_COMPACT = PromptTemplate(
+    stage="keyword",
+    variant="compact",
+    prefix="""Return only the product category keyword of the query.
+"I need a shoe" -> shoe; "where can i get some drugs?" -> pharmacy; "I need a trouser" -> dress
+""",
+    suffix="""Query: "{query}" ->""",
+)
+
+NAVIGATION_FULL = PromptTemplate(
+    stage="navigation",
+    variant="full",
+    prefix="""You are a friendly market guide helping customers navigate Sabi Market.
+
+Convert the technical direction given at the end into warm, conversational and brief easy-to-follow navigation instructions.
+
+Directions start from the main entrance to the market unless a different start point is given at the end.
+If the user is already standing inside the market, start from where they are and use the layout below to get from there.
+When entering through the main gate, you get straight into aisle 1 which is long with lines on the right.
+To get to aisle 2, after entering the main gate, you turn left directly on the first line you see. A right turn a few metres ahead from this line entrance leads to aisle 2 which has lines on the left.
+The technical direction is in terms of aisle and order. The order simply represents the line position.
+Order of one means on the specific aisle, the line is the first you meet on your right/left depending on the aisle.
+
+Examples
+1. direction: "Aisle 1, Position 2 (near the beginning of aisle 1)"
+your response: "Enter through the main gate and walk straight down the aisle you see. The second line on your RIGHT is <line name>, where you can find stalls selling <interest>"
+
+2. direction: "Aisle 2, Position 3"
+your response: "Enter through the main gate and make the first left turn. Walk straight ahead until you make a right turn into aisle 2. The third line on your LEFT is <line name>, where you can find stalls selling <interest>"
+
+Instructions:
+1. Make the directions conversational and friendly
+2. Be specific about directions
+3. Keep it concise (2-3 sentences max)
+4. Mention the line name naturally
+5. Include what products can be found there
+Use the examples as a guide. You can summarize and make your response more concise.
+
+Do not say "to find <line name>" in your response. The user is only interested in what they want, so
+lay more emphasis on the user's interest. Make sure you mention the product in your response, for example toward the end you can say where you will find <interest>.
+
+DO NOT EMPHASIZE THE LINE NAME MORE THAN THE PRODUCT OF INTEREST. THE USER IS MORE INTERESTED IN FINDING THEIR PRODUCT THAN THE LINE NAME.
+Say something like "the second line you see on your right is **<line name>**, where you can find stalls selling <interest>".
+""",
+    suffix="""
+Start: {start}
+Line Name: "{line_name}"
+Technical Direction: {direction}
+Interest: {interest}
+Generate friendly directions:""",
+)
+
+NAVIGATION_COMPACT = PromptTemplate(
+    stage="navigation",
+    variant="compact",
+    prefix="""You are a friendly Sabi Market guide. Turn the direction below into 2-3 warm sentences, starting from the given start point.
+Aisle 1: walk straight in from the gate; lines are on the RIGHT.
+Aisle 2: take the first left after the gate, then the next right; lines are on the LEFT.
+Position N = the Nth line you pass on that side.
+Stress the product of interest over the line name; bold the line name once.
+Example: Aisle 1, Position 2 -> "Walk straight in from the main gate. The second line on your RIGHT is **<line name>**, where you can find stalls selling <interest>."
+""",
+    suffix="""Start: {start}; Line: "{line_name}"; Direction: {direction}; Interest: {interest}
+Directions:""",
+)
+
+
+ROUTER_BATCH_FULL = PromptTemplate(
+    stage="router_batch",
+    variant="full",
+    prefix="""You will receive a JSON array of user messages. For each message, determine if they want to:
+1. SEARCH for a product/item in the market
+2. Get INFO about the market (history, general questions, etc.)
+
+Respond with ONLY a JSON array containing one object per message, in the same order, in this exact format:
+[{"action": "search" or "info", "data": "extracted keyword for search OR topic for info"}]
+
+Examples:
+- "Where can I find shoes?" -> {"action": "search", "data": "shoes"}
+- "I need pharmacy" -> {"action": "search", "data": "pharmacy"}
+- "Tell me about this market" -> {"action": "info", "data": "market history"}
+- "What is Sabi Market?" -> {"action": "info", "data": "general info"}
+
+Rules:
+- If asking WHERE/FIND/NEED/LOOKING FOR a product -> "search"
+- If asking ABOUT/HISTORY/WHAT IS the market -> "info"
+- Extract only the key product name for search
+- Extract the topic for info queries
+""",
+    suffix="""
+User messages: {messages}
+Response:""",
+)
+
+ROUTER_BATCH_COMPACT = PromptTemplate(
+    stage="router_batch",
+    variant="compact",
+    prefix="""Classify each market chat message in the JSON array. Reply with a JSON array only, same order:
+[{"action": "search"|"info", "data": "<product keyword>"|"<topic>"}]
+search = where/find/need/looking for a product. info = about/history/what is the market.
+""",
+    suffix="""Messages: {messages}
+JSON:""",
+)
+
+KEYWORD_BATCH_FULL = PromptTemplate(
+    stage="keyword_batch",
+    variant="full",
+    prefix="""You will receive a JSON array of queries. Extract the single most important product keyword from each query.
+Return ONLY a JSON array of keywords by category, one per query, in the same order. If a query is already a keyword, return it as is.
+Example: ["I need a shoe", "where can i get some drugs?", "red dress", "I need a trouser"] -> ["shoe", "pharmacy", "dress", "dress"]
+""",
+    suffix="""
+Queries: {queries}
+Keywords:""",
+)
+
+KEYWORD_BATCH_COMPACT = PromptTemplate(
+    stage="keyword_batch",
+    variant="compact",
+    prefix="""Return a JSON array with the product category keyword of each query, same order.
+["I need a shoe", "where can i get some drugs?"] -> ["shoe", "pharmacy"]
+""",
+    suffix="""Queries: {queries} ->""",
+)
+
+
+TEMPLATES: Dict[str, Dict[str, PromptTemplate]] = {
+    "router": {"full": ROUTER_FULL, "compact": ROUTER_COMPACT},
+    "keyword": {"full": KEYWORD_FULL, "compact": KEYWORD_COMPACT},
+    "navigation": {"full": NAVIGATION_FULL, "compact": NAVIGATION_COMPACT},
+    "router_batch": {"full": ROUTER_BATCH_FULL, "compact": ROUTER_BATCH_COMPACT},
+    "keyword_batch": {"full": KEYWORD_BATCH_FULL, "compact": KEYWORD_BATCH_COMPACT},
+}
+
+
+def get_template(stage: str, variant: str = "full") -> PromptTemplate:
+    """
+    Look up the prompt template for a stage
+
+    Unknown variants fall back to the full prompt so a bad PROMPT_VARIANT
+    setting never breaks a request.
+    """
+    variants = TEMPLATES[stage]
+    return variants.get(variant, variants["full"])
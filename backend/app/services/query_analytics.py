@@ -0,0 +1,194 @@
+"""
+Query analytics and cache prewarming for Sabi Market
+Reads the query log, finds popular and trending queries by hour of day, and
+replays the ones expected at peak market hours so the routing, keyword,
+navigation and info caches are warm before shoppers arrive.
+
+Run offline:
+    python -m app.services.query_analytics            # print the report
+    python -m app.services.query_analytics --prewarm  # report, then prewarm and measure in this process
+"""
+
+import asyncio
+import json
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from app.core.config import settings
+
+
+DAY_NAMES = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+def read_entries(paths: Iterable[str]) -> Iterator[Dict]:
+    """Yield log entries from the given files, skipping malformed lines"""
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except OSError as e:
+            print(f"Error reading query log {path}: {e}")
+
+
+def build_report(entries: Iterable[Dict], now: Optional[float] = None,
+                 top: int = 20, trend_days: int = 7) -> Dict:
+    """
+    Summarize the query log
+
+    Returns:
+        Dictionary with:
+            - popular: most frequent queries overall
+            - by_hour: most frequent queries per local hour of day
+            - trending: queries asked more in the last `trend_days` days than
+              in the `trend_days` before, scored by growth
+            - latency_ms: average latency per intent
+    """
+    now = now or time.time()
+    recent_start = now - trend_days * 86400
+    previous_start = recent_start - trend_days * 86400
+
+    total = Counter()
+    by_hour: Dict[int, Counter] = defaultdict(Counter)
+    recent, previous = Counter(), Counter()
+    latency: Dict[str, List[float]] = defaultdict(list)
+
+    for entry in entries:
+        query = entry.get("query")
+        if not query:
+            continue
+        ts = entry.get("ts", 0)
+        total[query] += 1
+        by_hour[datetime.fromtimestamp(ts).hour][query] += 1
+        if ts >= recent_start:
+            recent[query] += 1
+        elif ts >= previous_start:
+            previous[query] += 1
+        if entry.get("latency_ms") is not None:
+            latency[entry.get("intent") or "unknown"].append(entry["latency_ms"])
+
+    trending = sorted(
+        ((query, count / (previous[query] + 1)) for query, count in recent.items() if count >= 2),
+        key=lambda pair: pair[1],
+        reverse=True,
+    )[:top]
+
+    return {
+        "entries": sum(total.values()),
+        "distinct_queries": len(total),
+        "popular": total.most_common(top),
+        "by_hour": {hour: counts.most_common(top) for hour, counts in sorted(by_hour.items())},
+        "trending": [(query, round(score, 2)) for query, score in trending],
+        "latency_ms": {intent: round(sum(values) / len(values), 1) for intent, values in latency.items()},
+    }
+
+
+def select_prewarm_queries(report: Dict, hours: Iterable[int], limit: int) -> List[str]:
+    """Queries most likely during the given hours, then trending and overall favourites"""
+    per_hour = Counter()
+    for hour in hours:
+        for query, count in report["by_hour"].get(hour, []):
+            per_hour[query] += count
+    candidates = [query for query, _ in per_hour.most_common()]
+    candidates += [query for query, _ in report["trending"]]
+    candidates += [query for query, _ in report["popular"]]
+    return list(dict.fromkeys(candidates))[:limit]
+
+
+def prewarm(queries: List[str]) -> Dict:
+    """
+    Answer each query once to fill the caches, then again to measure the warm path
+
+    Returns:
+        Counts plus average latency before prewarming (cold) and after (warm)
+    """
+    from .chat_handler import get_intent_and_execute
+
+    def timed_pass() -> List[float]:
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            try:
+                get_intent_and_execute(query)
+            except Exception as e:
+                print(f"Prewarm failed for '{query}': {e}")
+                continue
+            timings.append(time.perf_counter() - start)
+        return timings
+
+    cold = timed_pass()
+    warm = timed_pass()
+    return {
+        "queries": len(queries),
+        "warmed": len(cold),
+        "cold_ms": round(sum(cold) / len(cold) * 1000, 1) if cold else None,
+        "warm_ms": round(sum(warm) / len(warm) * 1000, 1) if warm else None,
+        "finished_at": round(time.time(), 3),
+    }
+
+
+def parse_hours(value: str) -> List[int]:
+    """"6-10" -> [6, 7, 8, 9, 10]"""
+    start, _, end = value.partition("-")
+    return list(range(int(start), int(end or start) + 1))
+
+
+def next_prewarm_time(now: datetime) -> datetime:
+    """Next PREWARM_TIME on a market day, strictly after `now`"""
+    hour, minute = (int(part) for part in settings.PREWARM_TIME.split(":"))
+    market_days = {DAY_NAMES.index(day.strip()[:3].lower()) for day in settings.MARKET_DAYS.split(",") if day.strip()}
+    candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    for _ in range(8):
+        if candidate > now and (not market_days or candidate.weekday() in market_days):
+            return candidate
+        candidate += timedelta(days=1)
+    return candidate
+
+
+last_prewarm: Dict = {}
+
+
+def run_prewarm_job() -> Dict:
+    """Report on the query log and prewarm this process for the coming peak hours"""
+    from .query_log import query_log
+
+    query_log.flush()
+    report = build_report(read_entries(query_log.files()))
+    queries = select_prewarm_queries(report, parse_hours(settings.PEAK_HOURS), settings.PREWARM_LIMIT)
+    result = prewarm(queries)
+    last_prewarm.clear()
+    last_prewarm.update(result)
+    print(f"Prewarmed {result['warmed']}/{result['queries']} queries: "
+          f"{result['cold_ms']} ms cold -> {result['warm_ms']} ms warm")
+    return result
+
+
+async def prewarm_scheduler():
+    """Background task: prewarm ahead of peak hours on every market day"""
+    while True:
+        wake_at = next_prewarm_time(datetime.now())
+        await asyncio.sleep(max(0.0, (wake_at - datetime.now()).total_seconds()))
+        try:
+            await asyncio.to_thread(run_prewarm_job)
+        except Exception as e:
+            print(f"Prewarm job failed: {e}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query log report and cache prewarming")
+    parser.add_argument("--prewarm", action="store_true", help="prewarm this process after reporting")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    from .query_log import query_log
+
+    print(json.dumps(build_report(read_entries(query_log.files()), top=args.top), indent=2))
+    if args.prewarm:
+        print(json.dumps(run_prewarm_job(), indent=2))
@@ -0,0 +1,142 @@
+"""
+Query log for Sabi Market
+Asynchronous, append-only JSON-lines log of what users ask: normalized query,
+resolved intent, matched line ID and latency. Requests only enqueue a record; a
+background thread writes batches and rotates the file by size.
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from .cache import normalize_query
+
+
+class QueryLog:
+    """
+    Batched, size-rotated query log writer
+    """
+
+    def __init__(self, path: str, max_bytes: int = 10_000_000, backups: int = 5,
+                 batch_size: int = 200, flush_interval: float = 1.0, enabled: bool = True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self.written = 0
+        self.dropped = 0
+
+        self._queue: "queue.SimpleQueue[Dict]" = queue.SimpleQueue()
+        self._unwritten = 0  # enqueued but not yet written, including the writer's current batch
+        self._written_cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+
+    def record(self, query: str, intent: Optional[str], line_id: Optional[str], latency: float):
+        """Enqueue one query; never blocks on disk"""
+        if not self.enabled:
+            return
+        with self._written_cond:
+            self._unwritten += 1
+        self._queue.put({
+            "ts": round(time.time(), 3),
+            "query": normalize_query(query),
+            "intent": intent,
+            "line_id": line_id or None,
+            "latency_ms": round(latency * 1000, 1),
+        })
+        if self._writer is None:
+            self._start_writer()
+
+    def _start_writer(self):
+        with self._start_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="query-log-writer", daemon=True)
+                self._writer.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def flush(self, timeout: float = 5.0):
+        """Write everything queued so far, including a batch the writer thread holds"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._write(batch)
+        with self._written_cond:
+            self._written_cond.wait_for(lambda: self._unwritten <= 0, timeout)
+
+    def _write(self, batch: List[Dict]):
+        data = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in batch)
+        with self._write_lock:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                if os.path.exists(self.path) and os.path.getsize(self.path) + len(data) > self.max_bytes:
+                    self._rotate()
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(data)
+                self.written += len(batch)
+            except OSError as e:
+                self.dropped += len(batch)
+                print(f"Error writing query log: {e}")
+        with self._written_cond:
+            self._unwritten -= len(batch)
+            self._written_cond.notify_all()
+
+    def _rotate(self):
+        """queries.jsonl -> queries.jsonl.1 -> ... -> queries.jsonl.<backups>"""
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def files(self) -> List[str]:
+        """Existing log files, oldest first"""
+        rotated = [f"{self.path}.{index}" for index in range(self.backups, 0, -1)]
+        return [path for path in rotated + [self.path] if os.path.exists(path)]
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "path": self.path,
+            "written": self.written,
+            "dropped": self.dropped,
+            "pending": self._unwritten,
+        }
+
+
+# Global instance
+query_log = QueryLog(
+    path=settings.QUERY_LOG_PATH,
+    max_bytes=settings.QUERY_LOG_MAX_BYTES,
+    backups=settings.QUERY_LOG_BACKUPS,
+    enabled=settings.QUERY_LOG_ENABLED,
+)
+atexit.register(query_log.flush)
@@ -3,9 +3,14 @@ Router Service for Sabi Market Chat
 Routes user queries to appropriate services (search or info)
 """
 
-from typing import Dict, Literal
+import json
+import re
+from typing import Dict, List, Literal, Tuple
 from langchain_google_genai import GoogleGenerativeAI
 from app.core.config import settings
+from .cache import get_cache, normalize_query
+from .prompts import get_template
+from .token_accounting import token_accountant
 
 
 class RouterService:
@@ -24,6 +29,8 @@ class RouterService:
             temperature=0.3,  # Lower temperature for consistent routing
         )
         
+        self.cache = get_cache("routing")
+        
         print("Router Service initialized successfully.")
     
     def route(self, message: str) -> Dict[str, any]:
@@ -49,37 +56,21 @@ class RouterService:
         if not message or not message.strip():
             return {"action": "info", "topic": "general"}
         
+        key = normalize_query(message)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return {**cached, "original_message": message}
+        
         try:
-            prompt = f"""
-                Analyze this user message and determine if they want to:
-                1. SEARCH for a product/item in the market
-                2. Get INFO about the market (history, general questions, etc.)
-
-                User message: "{message}"
-
-                Respond with ONLY a JSON object in this exact format:
-                {{
-                "action": "search" or "info",
-                "data": "extracted keyword for search OR topic for info"
-                }}
-
-                Examples:
-                - "Where can I find shoes?" -> {{"action": "search", "data": "shoes"}}
-                - "I need pharmacy" -> {{"action": "search", "data": "pharmacy"}}
-                - "Tell me about this market" -> {{"action": "info", "data": "market history"}}
-                - "What is Sabi Market?" -> {{"action": "info", "data": "general info"}}
-
-                Rules:
-                - If asking WHERE/FIND/NEED/LOOKING FOR a product -> "search"
-                - If asking ABOUT/HISTORY/WHAT IS the market -> "info"
-                - Extract only the key product name for search
-                - Extract the topic for info queries
-
-                Response:
-            """
-            
-            response = self.model.invoke(prompt)
-            result = self._parse_response(response, message)
+            response = token_accountant.invoke(
+                self.model,
+                get_template("router", settings.PROMPT_VARIANT),
+                message=message,
+            )
+            result, parsed = self._parse_response(response, message)
+            if parsed:
+                # Only real model output is cached; the parse-failure default is retried next time
+                self.cache.set(key, result)
             
             return {**result, "original_message": message}
             
@@ -88,7 +79,54 @@ class RouterService:
             # Default to search if unsure
             return {"action": "search", "query": message}
     
-    def _parse_response(self, response: str, original_message: str) -> Dict[str, any]:
+    def route_batch(self, messages: List[str]) -> List[Dict[str, any]]:
+        """
+        Route several messages with a single LLM call
+        
+        Args:
+            messages: User chat messages
+        
+        Returns:
+            One routing dictionary per message, in the same order, shaped like
+            the output of route(). If the batched response cannot be parsed or
+            does not line up with the input, messages are routed one by one.
+        """
+        routes = {}
+        pending = []
+        for message in dict.fromkeys(messages):
+            if not message or not message.strip():
+                continue
+            cached = self.cache.get(normalize_query(message))
+            if cached is not None:
+                routes[message] = {**cached, "original_message": message}
+            else:
+                pending.append(message)
+        
+        if pending:
+            try:
+                response = token_accountant.invoke(
+                    self.model,
+                    get_template("router_batch", settings.PROMPT_VARIANT),
+                    messages=json.dumps(pending),
+                )
+                cleaned = re.sub(r'```json\s*|\s*```', '', response.strip())
+                parsed = json.loads(cleaned)
+                if not isinstance(parsed, list) or len(parsed) != len(pending):
+                    raise ValueError(f"expected {len(pending)} routes, got {cleaned[:200]}")
+                
+                for message, item in zip(pending, parsed):
+                    result, parsed = self._parse_response(json.dumps(item), message)
+                    if parsed:
+                        self.cache.set(normalize_query(message), result)
+                    routes[message] = {**result, "original_message": message}
+                    
+            except Exception as e:
+                print(f"Error routing batch, routing messages one by one: {e}")
+                routes.update({message: self.route(message) for message in pending})
+        
+        return [routes.get(message) or self.route(message) for message in messages]
+    
+    def _parse_response(self, response: str, original_message: str) -> Tuple[Dict[str, any], bool]:
         """
         Parse LLM response into structured format
         
@@ -97,11 +135,9 @@ class RouterService:
             original_message: Original user message (fallback)
         
         Returns:
-            Structured routing dictionary
+            (structured routing dictionary, whether it came from the response
+            rather than the search fallback used when it cannot be parsed)
         """
-        import json
-        import re
-        
         try:
             # Clean response (remove markdown code blocks if present)
             cleaned = response.strip()
@@ -118,18 +154,18 @@ class RouterService:
                 return {
                     "action": "search",
                     "query": data
-                }
+                }, True
             else:
                 return {
                     "action": "info",
                     "topic": data
-                }
+                }, True
                 
         except Exception as e:
             print(f"Error parsing router response: {e}")
             print(f"Raw response: {response}")
             # Fallback: assume search
-            return {"action": "search", "query": original_message}
+            return {"action": "search", "query": original_message}, False
 
 
 # Global instance
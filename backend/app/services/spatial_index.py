@@ -0,0 +1,145 @@
+"""
+Spatial index over the market map
+A uniform grid of map positions with nearest-k search, plus one grid per item
+so "nearest line selling X" never scans lines that do not sell X.
+Coordinates are pixels on the market map image (origin top-left).
+"""
+
+import heapq
+import math
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+class GridIndex:
+    """
+    Uniform grid over points with nearest-k queries
+
+    Points are bucketed into square cells; a query scans rings of cells
+    outward from the query point and stops as soon as no unscanned cell
+    can hold anything closer than the current k-th best.
+    """
+
+    def __init__(self, points: List[Tuple[float, float]], ids: List[int],
+                 cell_size: Optional[float] = None, per_cell: int = 4):
+        self.points = points
+        self.ids = ids
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+
+        if not points:
+            self.cell_size = 1.0
+            self.bounds = (0, 0, -1, -1)
+            return
+
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        if cell_size is None:
+            # Size cells so each holds about `per_cell` points on average
+            area = max(max(xs) - min(xs), 1.0) * max(max(ys) - min(ys), 1.0)
+            cell_size = math.sqrt(area * per_cell / len(points))
+        self.cell_size = max(cell_size, 1e-9)
+
+        for slot, (x, y) in enumerate(points):
+            self.cells.setdefault(self._cell(x, y), []).append(slot)
+
+        cxs = [c[0] for c in self.cells]
+        cys = [c[1] for c in self.cells]
+        self.bounds = (min(cxs), min(cys), max(cxs), max(cys))
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def _ring(self, cx: int, cy: int, r: int) -> Iterable[Tuple[int, int]]:
+        if r == 0:
+            yield cx, cy
+            return
+        for dx in range(-r, r + 1):
+            yield cx + dx, cy - r
+            yield cx + dx, cy + r
+        for dy in range(-r + 1, r):
+            yield cx - r, cy + dy
+            yield cx + r, cy + dy
+
+    def nearest(self, x: float, y: float, k: int = 1) -> List[Tuple[float, int]]:
+        """
+        Return up to k (distance, id) pairs ordered by distance from (x, y)
+        """
+        if not self.points or k <= 0:
+            return []
+
+        cx, cy = self._cell(x, y)
+        min_cx, min_cy, max_cx, max_cy = self.bounds
+        # Ring beyond which no occupied cell exists
+        max_r = max(abs(cx - min_cx), abs(cx - max_cx), abs(cy - min_cy), abs(cy - max_cy))
+
+        best: List[Tuple[float, int]] = []  # max-heap of (-dist2, slot)
+        cells = self.cells
+        points = self.points
+        for r in range(max_r + 1):
+            for cell in self._ring(cx, cy, r):
+                for slot in cells.get(cell, ()):
+                    px, py = points[slot]
+                    d2 = (px - x) ** 2 + (py - y) ** 2
+                    if len(best) < k:
+                        heapq.heappush(best, (-d2, slot))
+                    elif d2 < -best[0][0]:
+                        heapq.heapreplace(best, (-d2, slot))
+            # Anything in ring r+1 or beyond is at least r cells away
+            if len(best) == k and -best[0][0] <= (r * self.cell_size) ** 2:
+                break
+
+        return [(math.sqrt(-d2), self.ids[slot]) for d2, slot in sorted(best, reverse=True)]
+
+
+class SpatialIndex:
+    """
+    Nearest-line lookups over the market map
+
+    Holds one grid over every positioned line and one grid per item key,
+    all built once at load time.
+    """
+
+    def __init__(self, positions: Dict[int, Tuple[float, float]],
+                 items_by_line: Dict[int, Iterable[Hashable]]):
+        """
+        Args:
+            positions: line index -> (x, y) map position
+            items_by_line: line index -> item keys sold on that line
+        """
+        self.positions = positions
+        line_ids = list(positions)
+        self.all_lines = GridIndex([positions[i] for i in line_ids], line_ids)
+
+        postings: Dict[Hashable, List[int]] = {}
+        for line, items in items_by_line.items():
+            if line not in positions:
+                continue
+            for item in set(items):
+                postings.setdefault(item, []).append(line)
+        self.by_item: Dict[Hashable, GridIndex] = {
+            item: GridIndex([positions[i] for i in lines], lines)
+            for item, lines in postings.items()
+        }
+
+    def nearest(self, x: float, y: float, k: int = 1,
+                items: Optional[Iterable[Hashable]] = None) -> List[Tuple[float, int]]:
+        """
+        Nearest k lines to (x, y), optionally restricted to lines selling any of `items`
+
+        Returns:
+            (distance, line index) pairs ordered by distance, each line at most once
+        """
+        if items is None:
+            return self.all_lines.nearest(x, y, k)
+
+        merged: Dict[int, float] = {}
+        for item in items:
+            grid = self.by_item.get(item)
+            if grid is None:
+                continue
+            for distance, line in grid.nearest(x, y, k):
+                if distance < merged.get(line, math.inf):
+                    merged[line] = distance
+        return sorted((d, line) for line, d in merged.items())[:k]
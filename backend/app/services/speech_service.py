@@ -0,0 +1,456 @@
+"""
+Spoken directions for Sabi Market
+Synthesizes the navigation text for a line (and item) with a pluggable TTS
+engine and keeps the audio in a size-bounded disk cache keyed by the engine,
+voice, line, item and the catalog data the directions come from, so a given
+answer is synthesized (and its text generated) once, however the LLM phrases it
+next time. The cache directory is shared by every worker process. Every
+line/item pair can be pregenerated at startup.
+"""
+
+import hashlib
+import io
+import math
+import os
+import threading
+import time
+import wave
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from .data_loader import DataLoader, data_loader
+from .navigation_service import NavigationService, navigation_service
+
+
+class TTSEngine:
+    """
+    Text-to-speech engine interface
+    """
+
+    name = "base"
+    media_type = "application/octet-stream"
+    extension = "bin"
+
+    @property
+    def voice(self) -> str:
+        """Everything besides the text that changes the audio; part of the cache key"""
+        return ""
+
+    def synthesize(self, text: str) -> bytes:
+        raise NotImplementedError
+
+
+class GTTSEngine(TTSEngine):
+    """
+    Google Translate TTS through gTTS (needs network access)
+    """
+
+    name = "gtts"
+    media_type = "audio/mpeg"
+    extension = "mp3"
+
+    def __init__(self, lang: str = "en", tld: str = "com"):
+        from gtts import gTTS
+
+        self._gtts = gTTS
+        self.lang = lang
+        self.tld = tld
+
+    @property
+    def voice(self) -> str:
+        return f"{self.lang}-{self.tld}"
+
+    def synthesize(self, text: str) -> bytes:
+        buffer = io.BytesIO()
+        self._gtts(text=text, lang=self.lang, tld=self.tld).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class ToneEngine(TTSEngine):
+    """
+    Offline stand-in: one short tone per word as 16-bit mono WAV
+
+    Not speech; it keeps the endpoint, cache and frontend player working
+    without network access (development, tests, or when gTTS is down).
+    """
+
+    name = "tone"
+    media_type = "audio/wav"
+    extension = "wav"
+
+    def __init__(self, sample_rate: int = 8000):
+        self.sample_rate = sample_rate
+
+    @property
+    def voice(self) -> str:
+        return str(self.sample_rate)
+
+    def synthesize(self, text: str) -> bytes:
+        rate = self.sample_rate
+        samples = array("h")
+        gap = array("h", bytes(2 * rate // 25))  # 40 ms of silence between words
+        for word in text.split():
+            # Pitch from the word so the same word always sounds the same
+            frequency = 180 + int(hashlib.md5(word.encode()).hexdigest()[:4], 16) % 160
+            count = rate * min(60 * len(word), 400) // 1000
+            step = 2 * math.pi * frequency / rate
+            samples.extend(int(8000 * math.sin(step * i)) for i in range(count))
+            samples.extend(gap)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(rate)
+            wav.writeframes(samples.tobytes())
+        return buffer.getvalue()
+
+
+ENGINES = {"gtts": GTTSEngine, "tone": ToneEngine}
+
+
+def create_engine(name: str) -> TTSEngine:
+    """Configured engine, or the offline stand-in if it cannot be created"""
+    try:
+        if name == "gtts":
+            return GTTSEngine(settings.TTS_LANG, settings.TTS_TLD)
+        return ENGINES[name]()
+    except (ImportError, KeyError) as e:
+        print(f"TTS engine '{name}' unavailable ({e}); using the offline tone engine")
+        return ToneEngine()
+
+
+class AudioCache:
+    """
+    Disk cache of synthesized audio, evicting least recently used files beyond max_bytes
+
+    The directory is the source of truth, so several worker processes can share
+    it: files another process wrote are adopted on lookup, file modification
+    times carry the LRU order, and the directory is rescanned before evicting
+    and every `rescan_every` writes so the size accounting does not drift.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, rescan_every: int = 128):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.rescan_every = rescan_every
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self._entries: Dict[str, Tuple[str, int, float]] = {}  # key -> (filename, size, last used)
+        self._etags: Dict[str, str] = {}
+        self._load()
+
+    def _load(self):
+        """Rebuild the entries and total size from the directory"""
+        entries: Dict[str, Tuple[str, int, float]] = {}
+        if os.path.isdir(self.directory):
+            for filename in os.listdir(self.directory):
+                key, _, extension = filename.partition(".")
+                if not extension or extension.endswith("tmp"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.directory, filename))
+                except OSError:
+                    continue  # evicted by another process meanwhile
+                entries[key] = (filename, stat.st_size, stat.st_mtime)
+        self._entries = entries
+        self.total_bytes = sum(size for _, size, _ in entries.values())
+
+    def _lookup(self, key: str, extension: str) -> Optional[Tuple[str, int, float]]:
+        """Known entry, or a file another process wrote (adopted); None if neither. Call with the lock held."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+        filename = f"{key}.{extension}"
+        try:
+            stat = os.stat(os.path.join(self.directory, filename))
+        except OSError:
+            return None
+        entry = self._entries[key] = (filename, stat.st_size, stat.st_mtime)
+        self.total_bytes += stat.st_size
+        self._etags.pop(key, None)
+        return entry
+
+    def _forget(self, key: str):
+        """Drop an entry whose file is gone (evicted by another process). Call with the lock held."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+        self._etags.pop(key, None)
+
+    def path(self, key: str, extension: str) -> Optional[str]:
+        """Path of cached audio without counting a lookup or touching it"""
+        with self._lock:
+            entry = self._lookup(key, extension)
+            if entry is None:
+                return None
+            path = os.path.join(self.directory, entry[0])
+            if not os.path.exists(path):
+                self._forget(key)
+                return None
+        return path
+
+    def get(self, key: str, extension: str) -> Optional[str]:
+        """Path of the cached audio, marking it recently used; None on a miss"""
+        with self._lock:
+            entry = self._lookup(key, extension)
+            if entry is not None:
+                filename, size, _ = entry
+                path = os.path.join(self.directory, filename)
+                now = time.time()
+                try:
+                    os.utime(path, (now, now))  # the LRU order, shared across processes and restarts
+                except OSError:
+                    self._forget(key)
+                    entry = None
+                else:
+                    self._entries[key] = (filename, size, now)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return path
+
+    def put(self, key: str, extension: str, data: bytes) -> str:
+        """Store audio atomically, then evict the least recently used files over the limit"""
+        os.makedirs(self.directory, exist_ok=True)
+        filename = f"{key}.{extension}"
+        path = os.path.join(self.directory, filename)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            previous = self._entries.get(key)
+            self.total_bytes += len(data) - (previous[1] if previous else 0)
+            self._entries[key] = (filename, len(data), time.time())
+            self._etags.pop(key, None)
+            self._puts += 1
+            if self._puts % self.rescan_every == 0:
+                # Count what other processes wrote too
+                self._load()
+            if self.total_bytes > self.max_bytes:
+                self._evict(keep=key)
+        return path
+
+    def _evict(self, keep: str):
+        # Sizes and last use as on disk, whoever wrote them
+        self._load()
+        # Down to 90% so a full cache does not sort its entries on every put
+        target = self.max_bytes * 0.9
+        for key, (filename, size, _) in sorted(self._entries.items(), key=lambda item: item[1][2]):
+            if self.total_bytes <= target:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(os.path.join(self.directory, filename))
+            except OSError:
+                pass
+            del self._entries[key]
+            self._etags.pop(key, None)
+            self.total_bytes -= size
+            self.evictions += 1
+
+    def etag(self, key: str, path: str) -> str:
+        """Strong ETag from the audio bytes, computed once per file version"""
+        etag = self._etags.get(key)
+        if etag is None:
+            with open(path, "rb") as f:
+                etag = '"' + hashlib.sha256(f.read()).hexdigest()[:32] + '"'
+            self._etags[key] = etag
+        return etag
+
+    def stats(self) -> Dict:
+        return {
+            "files": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Single "bytes=" range -> inclusive (start, end); None for no or unsupported ranges
+
+    Raises:
+        ValueError: If the range cannot be satisfied (respond 416)
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start, _, end = header[len("bytes="):].strip().partition("-")
+    try:
+        if not start:
+            # Suffix range: the last N bytes
+            length = int(end)
+            if length <= 0:
+                raise ValueError(header)
+            return max(0, size - length), size - 1
+        first = int(start)
+        last = min(int(end), size - 1) if end else size - 1
+    except ValueError:
+        raise ValueError(f"Invalid range: {header}")
+    if first >= size or first > last:
+        raise ValueError(f"Unsatisfiable range: {header}")
+    return first, last
+
+
+class SpeechService:
+    """
+    Spoken navigation directions, synthesized once per line, item and engine
+    """
+
+    def __init__(self, engine: TTSEngine, cache: AudioCache, loader: DataLoader,
+                 navigator: NavigationService, fallback: Optional[TTSEngine] = None,
+                 failure_cooldown: float = 60.0):
+        self.engine = engine
+        self.cache = cache
+        self.loader = loader
+        self.navigator = navigator
+        self.fallback = fallback if fallback is None or fallback.name != engine.name else None
+        self.failure_cooldown = failure_cooldown
+        self.synthesized = 0
+        self.failures = 0
+        self.uncached = 0
+        self.last_warmup: Dict = {}
+        self._retry_at: Dict[str, float] = {}  # engine name -> monotonic time to try it again
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def _directions(self, match: Dict) -> Tuple[str, bool]:
+        """
+        Navigation text for a match, and whether it may be cached: the LLM's
+        directions, or layout-based walking directions while the LLM fails
+        """
+        try:
+            return self.navigator.generate(match), True
+        except Exception as e:
+            print(f"Navigation for speech failed, speaking walking directions uncached: {e}")
+            walk = self.loader.get_walking_directions(match)
+            if match.get("match_type") == "item":
+                walk = f"{walk} Ask for {match['matched_term']}."
+            return walk, False
+
+    def _cooling_down(self, engine: TTSEngine) -> bool:
+        return time.monotonic() < self._retry_at.get(engine.name, 0.0)
+
+    def _key(self, engine: TTSEngine, line_id: str, match: Dict) -> str:
+        """
+        Audio identity: the engine and voice, plus the line, item and catalog
+        data the directions are generated from. Not the generated text, which
+        varies between LLM calls, so a cached answer is never regenerated.
+        """
+        parts = (engine.name, engine.voice, line_id, match.get("matched_term") or "",
+                 match.get("line_name") or "", match.get("direction") or "")
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def speak(self, line_id: str, item: Optional[str] = None) -> Optional[Tuple[bytes, str, str]]:
+        """
+        Spoken directions to a line (and item); the text is generated and
+        synthesized on the first request only
+
+        Audio of fallback text (the LLM failed) is returned but not cached, so
+        the next request tries the LLM again. An engine that fails is skipped
+        for `failure_cooldown` seconds in favour of the fallback engine.
+
+        Returns:
+            (audio bytes, media_type, strong ETag), or None if the line does
+            not exist or does not sell the item
+
+        Raises:
+            Exception: If the engine and the fallback both fail
+        """
+        match = self.loader.get_match(line_id, item)
+        if match is None:
+            return None
+        engines = [self.engine] + ([self.fallback] if self.fallback else [])
+        text, cacheable = None, True
+        for engine in engines:
+            key = self._key(engine, line_id, match)
+            path = self.cache.get(key, engine.extension)
+            if path is None:
+                if engine is not engines[-1] and self._cooling_down(engine):
+                    continue
+                # Concurrent requests for the same audio wait for one synthesis
+                with self._lock_for(key):
+                    path = self.cache.path(key, engine.extension)
+                    if path is None:
+                        if text is None:
+                            text, cacheable = self._directions(match)
+                        try:
+                            data = engine.synthesize(text)
+                        except Exception as e:
+                            self.failures += 1
+                            self._retry_at[engine.name] = time.monotonic() + self.failure_cooldown
+                            print(f"TTS with {engine.name} failed, retrying it in {self.failure_cooldown:.0f} s: {e}")
+                            if engine is engines[-1]:
+                                raise
+                            continue
+                        self.synthesized += 1
+                        if not cacheable:
+                            self.uncached += 1
+                            return data, engine.media_type, '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+                        path = self.cache.put(key, engine.extension, data)
+            with open(path, "rb") as f:
+                data = f.read()
+            return data, engine.media_type, self.cache.etag(key, path)
+        raise RuntimeError("No TTS engine configured")
+
+    def pregenerate(self, concurrency: int = 4) -> Dict:
+        """Synthesize directions for every line and every item it sells, `concurrency` at a time"""
+        start = time.perf_counter()
+        before = self.synthesized
+        pairs = [(line["line_id"], item) for line in self.loader.get_all_lines()
+                 for item in (None,) + tuple(line["items_sold"])]
+
+        def generate(pair) -> bool:
+            try:
+                self.speak(*pair)
+                return True
+            except Exception:
+                return False
+
+        # Synthesis is network-bound; per-key locks keep each pair to one call
+        with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="speech-warmup") as pool:
+            failed = sum(1 for ok in pool.map(generate, pairs) if not ok)
+        self.last_warmup = {
+            "pairs": len(pairs),
+            "synthesized": self.synthesized - before,
+            "failed": failed,
+            "seconds": round(time.perf_counter() - start, 2),
+        }
+        print(f"Speech warmup: {self.last_warmup}")
+        return self.last_warmup
+
+    def stats(self) -> Dict:
+        return {
+            "engine": self.engine.name,
+            "synthesized": self.synthesized,
+            "failures": self.failures,
+            "uncached": self.uncached,
+            "cache": self.cache.stats(),
+            "warmup": self.last_warmup,
+        }
+
+
+# Global instance
+speech_service = SpeechService(
+    engine=create_engine(settings.TTS_ENGINE),
+    cache=AudioCache(settings.SPEECH_CACHE_DIR, settings.SPEECH_CACHE_MAX_BYTES),
+    loader=data_loader,
+    navigator=navigation_service,
+    fallback=ToneEngine(),
+    failure_cooldown=settings.TTS_FAILURE_COOLDOWN_SECONDS,
+)
@@ -0,0 +1,191 @@
+"""
+Typo-tolerant term lookup for Sabi Market
+A symmetric-delete (SymSpell-style) dictionary over catalog terms: every term
+is indexed under all strings reachable from its prefix by up to
+`max_distance` deletions, so a lookup only generates the deletes of the query
+and checks the handful of terms that share one. Lookup cost depends on the
+query length, not on the size of the catalog.
+"""
+
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+# Words in shoppers' questions that are never the product
+STOPWORDS = frozenset("""
+    a about an and any are at aisle buy can could do does find for from get give go how i in is it
+    line lines looking market me my near need of on or please sell seller sells selling shop some
+    stall store tell the there to want what where which who with you
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+class Suggestion(NamedTuple):
+    term: str  # canonical catalog term
+    distance: int  # edit distance from the (joined) query words
+    frequency: int  # how many lines carry the term
+    words: int = 1  # query words the suggestion covers
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def singular(word: str) -> str:
+    """Crude English singular, enough to line up "jewelries" with "jewelry" """
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("ses", "xes", "ches", "shes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Optimal string alignment distance, or max_distance + 1 once it is exceeded"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else max_distance + 1
+
+
+def allowed_distance(word: str, max_distance: int) -> int:
+    """Short words get fewer edits: "can" must not become "cans", nor "history" "victory" """
+    if len(word) <= 3:
+        return 0
+    if len(word) <= 7:
+        return min(1, max_distance)
+    return max_distance
+
+
+class SpellIndex:
+    """
+    Precomputed deletion-neighbourhood dictionary
+    """
+
+    def __init__(self, max_distance: int = 2, prefix_length: int = 7):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.words: Dict[str, Suggestion] = {}  # indexed spelling -> canonical term and frequency
+        self.deletes: Dict[str, List[str]] = {}  # delete of a spelling's prefix -> spellings
+
+    def add(self, word: str, frequency: int, term: Optional[str] = None):
+        """
+        Index `word` as a spelling of `term` (default: the word itself)
+
+        Args:
+            word: Lowercase alphanumeric spelling to match against
+            frequency: Number of lines carrying the term; ties go to the more common term
+            term: Catalog term returned for this spelling
+        """
+        if not word:
+            return
+        existing = self.words.get(word)
+        if existing is not None:
+            if existing.frequency >= frequency:
+                return
+        else:
+            for delete in self._deletes(word[:self.prefix_length], self.max_distance):
+                self.deletes.setdefault(delete, []).append(word)
+        self.words[word] = Suggestion(term or word, 0, frequency)
+
+    def _deletes(self, word: str, distance: int) -> Set[str]:
+        found = {word}
+        frontier = [word]
+        for _ in range(distance):
+            next_frontier = []
+            for candidate in frontier:
+                for i in range(len(candidate)):
+                    delete = candidate[:i] + candidate[i + 1:]
+                    if delete not in found:
+                        found.add(delete)
+                        next_frontier.append(delete)
+            frontier = next_frontier
+        return found
+
+    def lookup(self, word: str, max_distance: Optional[int] = None) -> List[Suggestion]:
+        """
+        Catalog terms within `max_distance` edits of `word`
+
+        Returns:
+            Suggestions ordered by distance, then frequency (most common first),
+            one per canonical term
+        """
+        if max_distance is None:
+            max_distance = allowed_distance(word, self.max_distance)
+        max_distance = min(max_distance, self.max_distance)
+
+        exact = self.words.get(word)
+        if max_distance == 0:
+            return [exact] if exact is not None else []
+
+        best: Dict[str, Suggestion] = {}
+        if exact is not None:
+            best[exact.term] = exact
+        checked = {word}
+        for delete in self._deletes(word[:self.prefix_length], max_distance):
+            for candidate in self.deletes.get(delete, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                distance = edit_distance(word, candidate, max_distance)
+                if distance > max_distance:
+                    continue
+                entry = self.words[candidate]
+                current = best.get(entry.term)
+                if current is None or distance < current.distance:
+                    best[entry.term] = entry._replace(distance=distance)
+        return sorted(best.values(), key=lambda s: (s.distance, -s.frequency, s.term))
+
+    def lookup_compound(self, text: str, max_words: int = 3) -> Optional[Suggestion]:
+        """
+        Best catalog term mentioned in free text, allowing typos, split and joined words
+
+        Stopwords are dropped, then every run of up to `max_words` consecutive
+        words is looked up with its spaces removed ("kitchen utensils" ->
+        "kitchenutensils"), and words with no match are tried split in two
+        ("shoesbags" -> "shoes", "bags"; one extra edit).
+
+        Returns:
+            The suggestion with the lowest distance, then covering the most
+            words, then the most frequent; None if nothing is close enough
+        """
+        words = [word for word in tokenize(text) if word not in STOPWORDS]
+        candidates: List[Suggestion] = []
+        for size in range(min(max_words, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                joined = "".join(words[start:start + size])
+                found = self.lookup(joined)
+                if found:
+                    candidates.append(found[0]._replace(words=size))
+                elif size == 1:
+                    candidates.extend(self._split(joined))
+        if not candidates:
+            return None
+        return min(candidates, key=lambda s: (s.distance, -s.words, -s.frequency, s.term))
+
+    def _split(self, word: str) -> Iterable[Suggestion]:
+        """Best two-part split of a word whose halves are both catalog terms"""
+        best = None
+        for i in range(4, len(word) - 3):
+            left, right = self.lookup(word[:i]), self.lookup(word[i:])
+            if left and right:
+                cost = left[0].distance + right[0].distance + 1
+                if best is None or cost < best[0]:
+                    best = (cost, left[0], right[0])
+        if best is None:
+            return []
+        cost, left, right = best
+        return [left._replace(distance=cost), right._replace(distance=cost)]
@@ -0,0 +1,116 @@
+"""
+Token accounting for Sabi Market LLM calls
+Records estimated input/output tokens and latency per call and per stage
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List
+
+from .prompts import PromptTemplate
+
+
+# Rough chars-per-token ratio for Gemini-style tokenizers on English text
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate; good enough for relative cost tracking"""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class TokenAccountant:
+    """
+    Collects per-call and per-stage token usage for every LLM invocation
+    """
+
+    def __init__(self, recent_size: int = 100):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=recent_size)
+
+    def invoke(self, model, template: PromptTemplate, **values) -> str:
+        """
+        Render a template, call the model and record the usage
+
+        Args:
+            model: Any object with an ``invoke(prompt) -> str`` method
+            template: Prompt template for the stage being called
+            **values: Values for the template's per-request suffix
+
+        Returns:
+            The raw model response
+        """
+        prompt = template.render(**values)
+        start = time.perf_counter()
+        try:
+            response = model.invoke(prompt)
+        except Exception:
+            self.record(template, prompt, "", time.perf_counter() - start, error=True)
+            raise
+        self.record(template, prompt, response or "", time.perf_counter() - start)
+        return response
+
+    def record(self, template: PromptTemplate, prompt: str, response: str,
+               latency: float, error: bool = False) -> Dict[str, Any]:
+        """Record one LLM call and return its accounting entry"""
+        entry = {
+            "stage": template.stage,
+            "variant": template.variant,
+            "input_tokens": estimate_tokens(prompt),
+            "prefix_tokens": estimate_tokens(template.prefix),
+            "output_tokens": estimate_tokens(response),
+            "latency_ms": round(latency * 1000, 2),
+            "error": error,
+            "timestamp": time.time(),
+        }
+        with self._lock:
+            stage = self._stages.setdefault(template.stage, {
+                "calls": 0,
+                "errors": 0,
+                "input_tokens": 0,
+                "prefix_tokens": 0,
+                "output_tokens": 0,
+                "latency_ms": 0.0,
+            })
+            stage["calls"] += 1
+            stage["errors"] += int(error)
+            stage["input_tokens"] += entry["input_tokens"]
+            stage["prefix_tokens"] += entry["prefix_tokens"]
+            stage["output_tokens"] += entry["output_tokens"]
+            stage["latency_ms"] += entry["latency_ms"]
+            self._recent.append(entry)
+        return entry
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-stage totals and averages plus the most recent calls"""
+        with self._lock:
+            stages = {}
+            for name, totals in self._stages.items():
+                calls = totals["calls"] or 1
+                stages[name] = {
+                    **totals,
+                    "latency_ms": round(totals["latency_ms"], 2),
+                    "avg_input_tokens": round(totals["input_tokens"] / calls, 1),
+                    "avg_output_tokens": round(totals["output_tokens"] / calls, 1),
+                    "avg_latency_ms": round(totals["latency_ms"] / calls, 2),
+                }
+            recent: List[Dict[str, Any]] = list(self._recent)
+        return {
+            "stages": stages,
+            "total_input_tokens": sum(s["input_tokens"] for s in stages.values()),
+            "total_output_tokens": sum(s["output_tokens"] for s in stages.values()),
+            "recent_calls": recent,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._recent.clear()
+
+
+# Global instance
+token_accountant = TokenAccountant()
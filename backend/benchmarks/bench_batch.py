@@ -0,0 +1,109 @@
+"""
+Benchmark: POST /chat/batch vs N sequential /chat calls
+Runs the chat pipeline in-process with simulated LLM clients (fixed latency
+per call) and compares wall time and LLM call counts for a burst of queries
+answered one by one against the same burst answered by execute_batch.
+
+Usage:
+    python benchmarks/bench_batch.py [--queries 40] [--duplicates 0.5] [--latency-ms 50]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Keep the benchmark offline: dummy Gemini key, no Tavily client
+os.environ["GOOGLE_API_KEY"] = "benchmark"
+os.environ["TAVILY_API_KEY"] = ""
+
+from app.services.chat_handler import execute_batch, get_intent_and_execute
+from app.services.llm_service import llm_service
+from app.services.navigation_service import navigation_service
+from app.services.router_service import router_service
+
+
+PRODUCTS = ["shoes", "wine", "medicine", "wigs", "bags", "dresses", "cosmetics", "dryfish", "beads", "drinks"]
+
+
+class SimulatedModel:
+    """Answers router/keyword prompts, single or batched, after a fixed delay"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def invoke(self, prompt: str) -> str:
+        self.calls += 1
+        time.sleep(self.latency)
+        if "JSON array" in prompt:
+            payload = prompt.rsplit(": [", 1)[1].rsplit("]", 1)[0]
+            messages = json.loads("[" + payload + "]")
+            if "action" in prompt:
+                return json.dumps([{"action": "search", "data": self._product(m)} for m in messages])
+            return json.dumps([self._product(m) for m in messages])
+        if '"action"' in prompt:
+            return json.dumps({"action": "search", "data": self._product(prompt.rsplit("\n", 2)[-2])})
+        if "Generate friendly directions" in prompt or "Directions:" in prompt:
+            return "Walk straight in from the main gate."
+        return self._product(prompt.rsplit("Query", 1)[-1])
+
+    def _product(self, text: str) -> str:
+        return next((product for product in PRODUCTS if product in text.lower()), "shoes")
+
+
+def make_queries(count: int, duplicates: float, rng: random.Random):
+    queries = []
+    for i in range(count):
+        if queries and rng.random() < duplicates:
+            queries.append(rng.choice(queries).upper())  # same query after normalization
+        else:
+            queries.append(f"where can I buy {rng.choice(PRODUCTS)} number {i}?")
+    return queries
+
+
+def install_models(latency: float) -> SimulatedModel:
+    model = SimulatedModel(latency)
+    router_service.model = model
+    llm_service.model = model
+    navigation_service.model = model
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=40)
+    parser.add_argument("--duplicates", type=float, default=0.5, help="fraction of repeated queries")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    queries = make_queries(args.queries, args.duplicates, random.Random(3))
+
+    model = install_models(args.latency_ms / 1000)
+    start = time.perf_counter()
+    sequential = [get_intent_and_execute(query) for query in queries]
+    sequential_s = time.perf_counter() - start
+    sequential_calls = model.calls
+
+    model = install_models(args.latency_ms / 1000)
+    start = time.perf_counter()
+    batched = asyncio.run(execute_batch(queries))
+    batched_s = time.perf_counter() - start
+
+    errors = sum(1 for result in batched if "error" in result)
+    print(f"{len(queries)} queries ({len(set(q.lower() for q in queries))} distinct), "
+          f"{args.latency_ms:.0f} ms per LLM call")
+    print(f"  sequential /chat: {sequential_s * 1000:8.0f} ms, {sequential_calls:4d} LLM calls")
+    print(f"  /chat/batch     : {batched_s * 1000:8.0f} ms, {model.calls:4d} LLM calls, {errors} errors")
+    print(f"  speedup         : {sequential_s / batched_s:8.1f}x")
+    assert len(batched) == len(sequential)
+
+
+if __name__ == "__main__":
+    main()
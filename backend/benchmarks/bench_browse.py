@@ -0,0 +1,118 @@
+"""
+Benchmark: catalog browse, linear scans vs secondary indexes
+Generates a synthetic marketway.json-shaped catalog, loads it through
+DataLoader and compares per-call latency of:
+    - lines by aisle: filter + sort over every line vs the aisle index
+    - line by name: scan of every name vs the name index
+    - a page of an aisle's lines: json.dumps per request vs the precomputed body
+
+Usage:
+    python benchmarks/bench_browse.py [--lines 100000] [--aisles 100] [--calls 200]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+os.environ["GOOGLE_API_KEY"] = "benchmark"
+os.environ["TAVILY_API_KEY"] = ""
+
+from app.core.config import settings
+from app.services.browse_service import BrowseService
+from app.services.data_loader import DataLoader
+
+
+def write_catalog(path: str, lines: int, aisles: int):
+    rng = random.Random(3)
+    vocab = [f"product{i:05d}" for i in range(5000)]
+    per_aisle = lines // aisles
+    market = {
+        f"l{i}": {
+            "aisle": i % aisles + 1,
+            "line_name": f"line number {i}",
+            "items_sold": rng.sample(vocab, 8),
+            "order": i // aisles + 1,
+            "position": {"x": rng.uniform(0, 608), "y": rng.uniform(0, 1080)},
+        }
+        for i in range(per_aisle * aisles)
+    }
+    with open(path, "w") as f:
+        json.dump(market, f)
+
+
+def linear_lines_by_aisle(loader: DataLoader, aisle: int):
+    """What get_lines_by_aisle did before the aisle index"""
+    return sorted((line for line in loader.lines if line["aisle"] == aisle), key=lambda x: x["order"])
+
+
+def linear_line_by_name(loader: DataLoader, name: str):
+    """What get_line_by_name did before the name index"""
+    name = name.lower()
+    for row, line_name in enumerate(loader.catalog.line_names_lower):
+        if line_name == name:
+            return loader.catalog[row]
+    return None
+
+
+def dumped_page(loader: DataLoader, aisle: int, limit: int) -> bytes:
+    """Serialize a page per request"""
+    lines = loader.get_lines_by_aisle(aisle)[:limit]
+    return json.dumps({"items": [
+        {"line_id": line["line_id"], "line_name": line["line_name"], "aisle": line["aisle"],
+         "order": line["order"], "direction": loader.get_direction(line)}
+        for line in lines
+    ]}).encode()
+
+
+def per_call_us(fn, args_list) -> float:
+    start = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - start) / len(args_list) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--aisles", type=int, default=100)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    settings.JSON_PATH = os.path.join(tempfile.mkdtemp(), "marketway.json")
+    write_catalog(settings.JSON_PATH, args.lines, args.aisles)
+
+    start = time.perf_counter()
+    loader = DataLoader()
+    load_s = time.perf_counter() - start
+    start = time.perf_counter()
+    browse = BrowseService(loader)
+    browse_s = time.perf_counter() - start
+    print(f"{len(loader.catalog)} lines: loaded with indexes in {load_s:.2f} s, "
+          f"browse bodies precomputed in {browse_s:.2f} s")
+
+    rng = random.Random(4)
+    aisles = [(rng.randint(1, args.aisles),) for _ in range(args.calls)]
+    names = [(f"Line Number {rng.randrange(len(loader.catalog))}",) for _ in range(args.calls)]
+
+    rows = [
+        ("lines by aisle", per_call_us(lambda a: linear_lines_by_aisle(loader, a), aisles),
+         per_call_us(loader.get_lines_by_aisle, aisles)),
+        ("line by name", per_call_us(lambda n: linear_line_by_name(loader, n), names),
+         per_call_us(loader.get_line_by_name, names)),
+        ("aisle page", per_call_us(lambda a: dumped_page(loader, a, settings.BROWSE_PAGE_SIZE), aisles),
+         per_call_us(browse.get_aisle_lines, aisles)),
+    ]
+    print(f"{'':>16} {'before':>12} {'after':>12}")
+    for name, before, after in rows:
+        print(f"{name:>16} {before:9.1f} us {after:9.2f} us  ({before / after:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: offline answer bundle size and build time
+Generates synthetic marketway.json-shaped catalogs of increasing size, loads
+each through DataLoader and measures:
+    - build: build_bundle() plus serialization and gzip
+    - size: raw and gzipped bundle bytes, per line
+    - delta: gzipped delta after changing the items of 1% of lines
+
+Usage:
+    python benchmarks/bench_bundle.py [--sizes 1000,10000,100000] [--items-per-line 8] [--changed 0.01]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+os.environ["GOOGLE_API_KEY"] = "benchmark"
+os.environ["TAVILY_API_KEY"] = ""
+os.environ["BUNDLE_DIR"] = tempfile.mkdtemp()
+
+from app.core.config import settings
+from app.services.answer_bundle import build_bundle, diff_bundles, prepare
+from app.services.data_loader import DataLoader
+
+
+def synthetic_market(lines: int, items_per_line: int, rng: random.Random):
+    vocab = [f"product{i:05d}" for i in range(max(1000, lines // 5))]
+    return {
+        f"l{i}": {
+            "aisle": i // 50 + 1,
+            "line_name": f"line number {i}",
+            "items_sold": rng.sample(vocab, items_per_line),
+            "order": i % 50 + 1,
+        }
+        for i in range(lines)
+    }, vocab
+
+
+def load(market) -> DataLoader:
+    with open(settings.JSON_PATH, "w") as f:
+        json.dump(market, f)
+    return DataLoader()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--items-per-line", type=int, default=8)
+    parser.add_argument("--changed", type=float, default=0.01)
+    args = parser.parse_args()
+
+    settings.JSON_PATH = os.path.join(tempfile.mkdtemp(), "marketway.json")
+    rng = random.Random(21)
+    rows = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        market, vocab = synthetic_market(size, args.items_per_line, rng)
+        old = build_bundle(load(market))
+
+        for line_id in rng.sample(sorted(market), max(1, int(size * args.changed))):
+            market[line_id]["items_sold"] = rng.sample(vocab, args.items_per_line)
+        loader = load(market)
+
+        start = time.perf_counter()
+        new = build_bundle(loader)
+        body, gzipped, _ = prepare(new, new["version"])
+        build_s = time.perf_counter() - start
+        delta_body, delta_gzipped, _ = prepare(diff_bundles(old, new), "delta")
+        rows.append((size, build_s, len(body), len(gzipped), len(delta_gzipped)))
+
+    print(f"{'lines':>8} {'build':>8} {'bundle':>10} {'gzipped':>10} {'per line':>9} {'delta gz':>10}")
+    for size, build_s, raw, gzipped, delta in rows:
+        print(f"{size:>8} {build_s:7.2f}s {raw / 1e6:7.2f} MB {gzipped / 1e6:7.2f} MB "
+              f"{gzipped / size:6.1f} B {delta / 1e3:7.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: catalog memory, dict-based vs compact
+Generates a synthetic marketway.json-shaped catalog and measures, with
+tracemalloc, the memory retained by:
+    - legacy: the parsed JSON dict + enriched per-line dicts + lines_by_id
+    - compact: CompactCatalog (the parsed JSON is released after building)
+and the size of one search hit (dict copy vs MatchView).
+
+Usage:
+    python benchmarks/bench_catalog_memory.py [--items 1000000] [--items-per-line 10] [--vocab 20000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.compact_catalog import CompactCatalog, LineView, MatchView
+
+
+def synthetic_json(items: int, items_per_line: int, vocab_size: int) -> str:
+    rng = random.Random(11)
+    vocab = [f"product{i:05d}" for i in range(vocab_size)]
+    lines = items // items_per_line
+    market = {
+        f"l{i}": {
+            "aisle": i // 100 + 1,
+            "line_name": f"line number {i}",
+            "items_sold": rng.sample(vocab, items_per_line),
+            "order": i % 100 + 1,
+            "position": {"x": rng.uniform(0, 608), "y": rng.uniform(0, 1080)},
+        }
+        for i in range(lines)
+    }
+    return json.dumps(market)
+
+
+def build_legacy(text: str):
+    """The structures DataLoader kept before the compact catalog"""
+    market_data = json.loads(text)
+    lines, lines_by_id = [], {}
+    for line_id, line_data in market_data.items():
+        enriched_line = {
+            "line_id": line_id,
+            "line_name": line_data.get("line_name", ""),
+            "aisle": line_data.get("aisle", 0),
+            "items_sold": line_data.get("items_sold", []),
+            "order": line_data.get("order", 999),
+            "position": line_data.get("position"),
+        }
+        lines.append(enriched_line)
+        lines_by_id[line_id] = enriched_line
+    lines.sort(key=lambda x: (x["aisle"], x["order"]))
+    return market_data, lines, lines_by_id
+
+
+def build_compact(text: str):
+    market_data = json.loads(text)
+    catalog = CompactCatalog.from_market_data(market_data)
+    del market_data
+    return catalog
+
+
+def measure(builder, text: str):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = builder(text)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1_000_000)
+    parser.add_argument("--items-per-line", type=int, default=10)
+    parser.add_argument("--vocab", type=int, default=20_000)
+    args = parser.parse_args()
+
+    text = synthetic_json(args.items, args.items_per_line, args.vocab)
+    print(f"{args.items} items on {args.items // args.items_per_line} lines, "
+          f"{args.vocab} distinct items, {len(text) / 1e6:.1f} MB of JSON")
+
+    legacy, legacy_bytes, legacy_peak, legacy_s = measure(build_legacy, text)
+    hit = {**legacy[1][0], "match_type": "item", "matched_term": "x", "direction": "Aisle 1, Position 1"}
+    legacy_hit = sys.getsizeof(hit)
+    del legacy, hit
+
+    catalog, compact_bytes, compact_peak, compact_s = measure(build_compact, text)
+    compact_hit = sys.getsizeof(MatchView(LineView(catalog, 0), "item", "x", "Aisle 1, Position 1")) \
+        + sys.getsizeof(LineView(catalog, 0))
+
+    for name, retained, peak, seconds in (
+        ("legacy", legacy_bytes, legacy_peak, legacy_s),
+        ("compact", compact_bytes, compact_peak, compact_s),
+    ):
+        print(f"{name:>8}: {retained / 1e6:8.1f} MB retained, {retained / args.items:6.1f} bytes/item, "
+              f"peak {peak / 1e6:8.1f} MB, built in {seconds:5.2f} s")
+    print(f"compact retains {legacy_bytes / compact_bytes:.1f}x less memory")
+    print(f"search hit: dict copy {legacy_hit} bytes, view {compact_hit} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: cold-miss latency with and without prewarming
+Writes a synthetic query log (morning-heavy traffic over two weeks), builds
+the analytics report, and replays a morning's queries against the chat
+pipeline with simulated LLM clients:
+    - cold: caches empty, as after a deploy or restart
+    - prewarmed: after run_prewarm_job() filled the caches for peak hours
+
+Usage:
+    python benchmarks/bench_prewarm.py [--latency-ms 50] [--morning-queries 200]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Keep the benchmark offline and its log out of the data directory
+os.environ["GOOGLE_API_KEY"] = "benchmark"
+os.environ["TAVILY_API_KEY"] = ""
+os.environ["QUERY_LOG_PATH"] = os.path.join(tempfile.mkdtemp(), "queries.jsonl")
+
+from app.services.cache import cache_stats, get_cache
+from app.services.chat_handler import get_intent_and_execute
+from app.services.query_analytics import build_report, read_entries, run_prewarm_job
+from app.services.query_log import query_log
+from bench_batch import PRODUCTS, install_models
+
+
+def write_synthetic_log(days: int, per_day: int, rng: random.Random):
+    """Mornings ask for fresh food and medicine, afternoons for clothes"""
+    morning = [f"where can i buy {p}" for p in ("dryfish", "medicine", "drinks", "wine")]
+    afternoon = [f"where can i buy {p}" for p in PRODUCTS]
+    now = time.time()
+    os.makedirs(os.path.dirname(query_log.path), exist_ok=True)
+    with open(query_log.path, "w", encoding="utf-8") as f:
+        for day in range(days):
+            midnight = now - (day + 1) * 86400
+            midnight -= midnight % 86400
+            for _ in range(per_day):
+                hour = rng.choice([6, 7, 8, 9, 10]) if rng.random() < 0.7 else rng.randint(11, 18)
+                query = rng.choice(morning if hour <= 10 else afternoon)
+                f.write(json.dumps({"ts": midnight + hour * 3600 + rng.random() * 3600, "query": query,
+                                    "intent": "search", "line_id": None, "latency_ms": 0.0}) + "\n")
+
+
+def clear_caches():
+    for name in cache_stats():
+        get_cache(name).clear()
+
+
+def replay(queries):
+    """Average latency over all queries and over each query's first (cache-miss) occurrence"""
+    seen, timings, first_timings = set(), [], []
+    for query in queries:
+        start = time.perf_counter()
+        get_intent_and_execute(query)
+        elapsed = (time.perf_counter() - start) * 1000
+        timings.append(elapsed)
+        if query not in seen:
+            seen.add(query)
+            first_timings.append(elapsed)
+    return sum(timings) / len(timings), sum(first_timings) / len(first_timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--morning-queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    install_models(args.latency_ms / 1000)
+    write_synthetic_log(days=14, per_day=300, rng=rng)
+    report = build_report(read_entries(query_log.files()))
+    print(f"log: {report['entries']} entries, {report['distinct_queries']} distinct queries")
+
+    morning = [query for query, _ in report["by_hour"].get(8, [])]
+    weights = [count for _, count in report["by_hour"].get(8, [])]
+    replay_queries = rng.choices(morning, weights=weights, k=args.morning_queries)
+
+    clear_caches()
+    cold = replay(replay_queries)
+
+    clear_caches()
+    job = run_prewarm_job()
+    prewarmed = replay(replay_queries)
+
+    print(f"prewarm job: {job['warmed']} queries, {job['cold_ms']} ms cold -> {job['warm_ms']} ms warm")
+    print(f"morning replay ({len(replay_queries)} queries, {len(set(replay_queries))} distinct):")
+    print(f"    cold caches : {cold[0]:7.1f} ms per query, {cold[1]:7.1f} ms first request per query")
+    print(f"    prewarmed   : {prewarmed[0]:7.1f} ms per query, {prewarmed[1]:7.1f} ms first request per query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: profiling middleware overhead
+Drives a small ASGI app that does chat-like work (JSON encoding and a catalog
+scan) directly, without a server, and compares the per-request cost of:
+    - no middleware
+    - ProfilingMiddleware with profiling disabled
+    - profiling enabled, sample rate 0 (nothing sampled)
+    - profiling enabled, every request sampled
+
+Usage:
+    python benchmarks/bench_profiler.py [--requests 20000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.profiler import ProfilingMiddleware, SamplingProfiler
+
+
+CATALOG = [{"line_name": f"line {i}", "items_sold": [f"item {i}-{j}" for j in range(5)]} for i in range(50)]
+
+
+async def chat_app(scope, receive, send):
+    keyword = "item 42-3"
+    match = next((line for line in CATALOG if any(keyword in item for item in line["items_sold"])), None)
+    body = json.dumps({"name": match["line_name"] if match else "", "direction": "Aisle 1"}).encode()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def drive(app, requests: int) -> float:
+    scope = {"type": "http", "path": "/chat", "headers": [(b"host", b"bench")]}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(scope, receive, send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    cases = [
+        ("no middleware", chat_app),
+        ("disabled", ProfilingMiddleware(chat_app, SamplingProfiler(enabled=False))),
+        ("enabled, rate 0", ProfilingMiddleware(chat_app, SamplingProfiler(enabled=True, sample_rate=0.0))),
+        ("enabled, rate 1", ProfilingMiddleware(chat_app, SamplingProfiler(enabled=True, sample_rate=1.0))),
+    ]
+
+    baseline = None
+    for name, app in cases:
+        asyncio.run(drive(app, 1000))  # warm up
+        per_request = asyncio.run(drive(app, args.requests))
+        baseline = baseline or per_request
+        print(f"{name:>16}: {per_request:8.2f} us/request ({per_request - baseline:+.2f} us)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: full vs compact prompts
+Measures estimated input/output tokens and latency per /chat request
+(router + keyword + navigation stages).
+
+By default the LLM is simulated with a latency model proportional to the
+prompt size, so the benchmark runs offline. Pass --live to call Gemini with
+the configured GOOGLE_API_KEY instead.
+
+Usage:
+    python benchmarks/bench_prompts.py [--requests 50] [--live]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.prompts import get_template
+from app.services.token_accounting import TokenAccountant, estimate_tokens
+
+
+QUERIES = [
+    ("Where can I find shoes?", "godly line", "Aisle 1, Position 2 (near the beginning of aisle 1)", "shoes"),
+    ("I need some medicine for my baby", "mothers line", "Aisle 2, Position 5 (in the middle of aisle 2)", "medicine"),
+    ("where do they sell dry fish", "fish line", "Aisle 1, Position 10 (towards the end of aisle 1)", "dryfish"),
+    ("kitchen utensils please", "wisdom line", "Aisle 1, Position 3 (near the beginning of aisle 1)", "kitchenutensils"),
+]
+
+
+class SimulatedModel:
+    """Latency grows with prompt size, like a hosted model without prefix caching"""
+
+    def __init__(self, base_ms: float, per_token_us: float, reply: str):
+        self.base_ms = base_ms
+        self.per_token_us = per_token_us
+        self.reply = reply
+
+    def invoke(self, prompt: str) -> str:
+        time.sleep((self.base_ms * 1000 + self.per_token_us * estimate_tokens(prompt)) / 1e6)
+        return self.reply
+
+
+def build_models(live: bool):
+    if live:
+        from langchain_google_genai import GoogleGenerativeAI
+        from app.core.config import settings
+        model = GoogleGenerativeAI(model=settings.gemini_model, google_api_key=settings.google_api_key)
+        return model, model, model
+    return (
+        SimulatedModel(2, 20, '{"action": "search", "data": "shoes"}'),
+        SimulatedModel(2, 20, "shoes"),
+        SimulatedModel(2, 20, "Walk straight in from the main gate. The second line on your RIGHT is "
+                              "**godly line**, where you can find stalls selling shoes."),
+    )
+
+
+def run(variant: str, requests: int, live: bool) -> dict:
+    router_model, keyword_model, navigation_model = build_models(live)
+    accountant = TokenAccountant()
+    start = time.perf_counter()
+    for i in range(requests):
+        message, line_name, direction, interest = QUERIES[i % len(QUERIES)]
+        accountant.invoke(router_model, get_template("router", variant), message=message)
+        accountant.invoke(keyword_model, get_template("keyword", variant), query=message)
+        accountant.invoke(navigation_model, get_template("navigation", variant),
+                          start="the main gate", line_name=line_name, direction=direction, interest=interest)
+    elapsed = time.perf_counter() - start
+    snapshot = accountant.snapshot()
+    return {
+        "variant": variant,
+        "input_tokens_per_request": snapshot["total_input_tokens"] / requests,
+        "output_tokens_per_request": snapshot["total_output_tokens"] / requests,
+        "latency_ms_per_request": elapsed * 1000 / requests,
+        "stages": {name: stage["avg_input_tokens"] for name, stage in snapshot["stages"].items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--live", action="store_true", help="call Gemini instead of the simulated model")
+    args = parser.parse_args()
+
+    results = [run(variant, args.requests, args.live) for variant in ("full", "compact")]
+    for result in results:
+        print(f"{result['variant']:>8}: {result['input_tokens_per_request']:7.1f} in / "
+              f"{result['output_tokens_per_request']:5.1f} out tokens per request, "
+              f"{result['latency_ms_per_request']:7.2f} ms per request  {result['stages']}")
+
+    full, compact = results
+    saved = 1 - compact["input_tokens_per_request"] / full["input_tokens_per_request"]
+    faster = 1 - compact["latency_ms_per_request"] / full["latency_ms_per_request"]
+    print(f"compact saves {saved:.0%} input tokens and {faster:.0%} latency per request")
+
+
+if __name__ == "__main__":
+    main()
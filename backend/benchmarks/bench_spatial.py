@@ -0,0 +1,64 @@
+"""
+Benchmark: nearest-line queries on synthetic markets
+Builds a SpatialIndex over N randomly placed stalls selling random items and
+times nearest-k queries, unfiltered and filtered by item.
+
+Usage:
+    python benchmarks/bench_spatial.py [--stalls 10000 100000] [--queries 5000] [--k 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.spatial_index import SpatialIndex
+
+
+MAP_WIDTH, MAP_HEIGHT = 608, 1080
+ITEMS = [f"item{i}" for i in range(200)]
+
+
+def build(stalls: int, rng: random.Random) -> SpatialIndex:
+    positions = {i: (rng.uniform(0, MAP_WIDTH), rng.uniform(0, MAP_HEIGHT)) for i in range(stalls)}
+    items = {i: rng.sample(ITEMS, 5) for i in range(stalls)}
+    return SpatialIndex(positions, items)
+
+
+def time_queries(index: SpatialIndex, queries: int, k: int, rng: random.Random, filtered: bool):
+    points = [(rng.uniform(0, MAP_WIDTH), rng.uniform(0, MAP_HEIGHT)) for _ in range(queries)]
+    items = [[rng.choice(ITEMS)] if filtered else None for _ in range(queries)]
+    timings = []
+    for (x, y), item in zip(points, items):
+        start = time.perf_counter()
+        index.nearest(x, y, k, items=item)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return sum(timings) / len(timings) * 1e6, timings[int(len(timings) * 0.99)] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stalls", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    for stalls in args.stalls:
+        start = time.perf_counter()
+        index = build(stalls, rng)
+        build_ms = (time.perf_counter() - start) * 1000
+        print(f"{stalls:>8} stalls: built in {build_ms:.0f} ms")
+        for filtered in (False, True):
+            mean_us, p99_us = time_queries(index, args.queries, args.k, rng, filtered)
+            label = "by item" if filtered else "any line"
+            print(f"    nearest-{args.k} {label:>8}: mean {mean_us:6.1f} us, p99 {p99_us:6.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: spoken directions, synthesis vs disk cache
+Uses the real catalog, a navigator with simulated LLM latency and a TTS
+engine with simulated network latency standing in for gTTS, and measures:
+    - warmup: pregenerating audio for every line/item pair
+    - cold: directions text + synthesis per request (empty cache)
+    - cached: the same requests after warmup
+
+Usage:
+    python benchmarks/bench_speech.py [--tts-latency-ms 300] [--llm-latency-ms 50] [--concurrency 4]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+os.environ["GOOGLE_API_KEY"] = "benchmark"
+os.environ["TAVILY_API_KEY"] = ""
+
+from app.services.data_loader import data_loader
+from app.services.speech_service import AudioCache, SpeechService, ToneEngine
+
+
+class SlowToneEngine(ToneEngine):
+    """Tone audio after a fixed delay, like a network TTS call"""
+
+    name = "slow-tone"
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+
+    def synthesize(self, text: str) -> bytes:
+        time.sleep(self.latency)
+        return super().synthesize(text)
+
+
+class SimulatedNavigator:
+    """Distinct, deterministic directions per line/item after an LLM-like delay, cached like NavigationService"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.cache = {}
+
+    def generate(self, match) -> str:
+        key = (match["line_id"], match["matched_term"])
+        if key not in self.cache:
+            time.sleep(self.latency)
+            line = data_loader.get_line_by_id(match["line_id"])
+            self.cache[key] = f"{data_loader.get_walking_directions(line)} Ask for {match['matched_term']}."
+        return self.cache[key]
+
+
+def requests_per_pair(service: SpeechService):
+    pairs = [(line["line_id"], item) for line in data_loader.get_all_lines() for item in (None,) + line["items_sold"]]
+    start = time.perf_counter()
+    for line_id, item in pairs:
+        service.speak(line_id, item)
+    return len(pairs), (time.perf_counter() - start) / len(pairs) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tts-latency-ms", type=float, default=300)
+    parser.add_argument("--llm-latency-ms", type=float, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    engine = SlowToneEngine(args.tts_latency_ms / 1000)
+    llm_latency = args.llm_latency_ms / 1000
+
+    cold_service = SpeechService(engine, AudioCache(tempfile.mkdtemp(), 10**9), data_loader,
+                                 SimulatedNavigator(llm_latency))
+    pairs, cold_ms = requests_per_pair(cold_service)
+
+    service = SpeechService(engine, AudioCache(tempfile.mkdtemp(), 10**9), data_loader,
+                            SimulatedNavigator(llm_latency))
+    warmup = service.pregenerate(args.concurrency)
+    _, cached_ms = requests_per_pair(service)
+
+    print(f"{pairs} line/item pairs, warmup {warmup['seconds']} s with {args.concurrency} threads, "
+          f"{service.cache.total_bytes / 1e6:.1f} MB of audio")
+    print(f"    cold   : {cold_ms:8.1f} ms per request")
+    print(f"    cached : {cached_ms:8.3f} ms per request, {service.synthesized - warmup['synthesized']} re-synthesized")
+
+
+if __name__ == "__main__":
+    main()
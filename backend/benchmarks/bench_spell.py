@@ -0,0 +1,85 @@
+"""
+Benchmark: typo-tolerant lookup, symmetric-delete index vs linear scan
+Builds SpellIndex over synthetic vocabularies of increasing size and times
+lookups of misspelled terms (one or two random edits) against:
+    - linear: edit_distance against every term
+    - index: SpellIndex.lookup (deletes of the query only)
+
+Usage:
+    python benchmarks/bench_spell.py [--sizes 1000,10000,100000] [--queries 300]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.spell_index import SpellIndex, allowed_distance, edit_distance
+
+
+def make_vocab(size: int, rng: random.Random):
+    vocab = set()
+    while len(vocab) < size:
+        vocab.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 14))))
+    return sorted(vocab)
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    for _ in range(rng.choice([1, 2]) if len(word) > 7 else 1):
+        i = rng.randrange(len(word))
+        edit = rng.choice(["delete", "insert", "replace"])
+        letter = rng.choice(string.ascii_lowercase)
+        if edit == "delete" and len(word) > 4:
+            word = word[:i] + word[i + 1:]
+        elif edit == "insert":
+            word = word[:i] + letter + word[i:]
+        else:
+            word = word[:i] + letter + word[i + 1:]
+    return word
+
+
+def linear_lookup(vocab, word):
+    max_distance = allowed_distance(word, 2)
+    return min(((edit_distance(word, term, max_distance), term) for term in vocab), default=None)
+
+
+def per_query_us(fn, queries) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(9)
+    print(f"{'terms':>8} {'build':>8} {'deletes':>10} {'linear':>12} {'index':>10} {'found':>6}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        vocab = make_vocab(size, rng)
+        start = time.perf_counter()
+        index = SpellIndex()
+        for term in vocab:
+            index.add(term, rng.randint(1, 50))
+        build_s = time.perf_counter() - start
+
+        targets = rng.sample(vocab, min(args.queries, size))
+        queries = [misspell(term, rng) for term in targets]
+        linear_queries = queries[:max(10, args.queries * 1000 // size)]
+        linear_us = per_query_us(lambda q: linear_lookup(vocab, q), linear_queries)
+        index_us = per_query_us(index.lookup, queries)
+        found = sum(1 for query, term in zip(queries, targets) if any(s.term == term for s in index.lookup(query)))
+        print(f"{size:>8} {build_s:7.2f}s {len(index.deletes):>10} {linear_us:9.0f} us {index_us:7.0f} us "
+              f"{found / len(queries):6.0%}")
+
+
+if __name__ == "__main__":
+    main()
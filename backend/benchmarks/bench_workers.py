@@ -0,0 +1,165 @@
+"""
+Benchmark: memory and cache hit rate with 1, 4 and 8 forked workers
+Each configuration runs in a fresh process that preloads a synthetic catalog
+and the services, freezes them (app.serve.freeze_preloaded) and forks the
+workers. The workers answer a round-robin share of the same Zipf-distributed
+query stream with simulated LLM clients, then report:
+    - RSS, PSS and private (USS) memory per worker, from /proc/self/smaps_rollup
+    - cache hit rate over routing/keyword/navigation lookups, and LLM calls
+for private per-process caches, for the shared SQLite tier, and for the
+shared tier without gc.freeze. Each worker runs a full collection before
+measuring, as a long-lived worker eventually would.
+
+Usage:
+    python benchmarks/bench_workers.py [--workers 1,4,8] [--lines 50000] [--queries 800] [--distinct 200]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def memory_kb():
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def write_catalog(path: str, lines: int):
+    rng = random.Random(3)
+    vocab = [f"product{i:05d}" for i in range(5000)] + ["shoes", "wine", "medicine", "wigs", "bags"]
+    market = {
+        f"l{i}": {
+            "aisle": i // 50 + 1,
+            "line_name": f"line number {i}",
+            "items_sold": rng.sample(vocab, 8),
+            "order": i % 50 + 1,
+            "position": {"x": rng.uniform(0, 608), "y": rng.uniform(0, 1080)},
+        }
+        for i in range(lines)
+    }
+    with open(path, "w") as f:
+        json.dump(market, f)
+
+
+def run_configuration(mode: str, workers: int, args) -> dict:
+    """Body of the per-configuration process: preload, freeze, fork, collect"""
+    os.environ["GOOGLE_API_KEY"] = "benchmark"
+    os.environ["TAVILY_API_KEY"] = ""
+    os.environ["QUERY_LOG_ENABLED"] = "false"
+    os.environ["SHARED_CACHE_PATH"] = "" if mode == "private" else os.path.join(tempfile.mkdtemp(), "shared.sqlite3")
+
+    from app.core.config import settings
+    settings.JSON_PATH = args.catalog
+
+    from app.serve import freeze_preloaded
+    from app.services.cache import cache_stats
+    from app.services.chat_handler import get_intent_and_execute
+    from bench_batch import PRODUCTS, install_models
+
+    model = install_models(args.latency_ms / 1000)
+    rng = random.Random(17)
+    distinct = [f"where can I buy {rng.choice(PRODUCTS)} from stall {i}?" for i in range(args.distinct)]
+    weights = [1 / (rank + 1) for rank in range(len(distinct))]
+    stream = rng.choices(distinct, weights=weights, k=args.queries)
+    if mode != "no-freeze":
+        freeze_preloaded()
+
+    pipes = []
+    for number in range(workers):
+        read_fd, write_fd = os.pipe()
+        if os.fork() == 0:
+            os.close(read_fd)
+            for query in stream[number::workers]:
+                get_intent_and_execute(query)
+            gc.collect()
+            result = {"memory": memory_kb(), "caches": cache_stats(), "llm_calls": model.calls}
+            with os.fdopen(write_fd, "w") as out:
+                json.dump(result, out)
+            os._exit(0)
+        os.close(write_fd)
+        pipes.append(read_fd)
+
+    results = []
+    for read_fd in pipes:
+        with os.fdopen(read_fd) as f:
+            results.append(json.load(f))
+    while True:
+        try:
+            os.wait()
+        except ChildProcessError:
+            break
+
+    hits = lookups = 0
+    for result in results:
+        for stats in result["caches"].values():
+            worker_lookups = stats["hits"] + stats["misses"]
+            lookups += worker_lookups
+            hits += stats["hits"] + stats.get("shared", {}).get("hits", 0)
+    count = len(results)
+    return {
+        "mode": mode,
+        "workers": workers,
+        "rss_mb": sum(r["memory"]["rss"] for r in results) / count / 1024,
+        "pss_mb": sum(r["memory"]["pss"] for r in results) / count / 1024,
+        "uss_mb": sum(r["memory"]["uss"] for r in results) / count / 1024,
+        "hit_rate": hits / lookups if lookups else 0.0,
+        "llm_calls": sum(r["llm_calls"] for r in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,4,8")
+    parser.add_argument("--lines", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=800)
+    parser.add_argument("--distinct", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    parser.add_argument("--run", nargs=2, metavar=("MODE", "WORKERS"), help=argparse.SUPPRESS)
+    parser.add_argument("--catalog", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_configuration(args.run[0], int(args.run[1]), args)))
+        return
+
+    args.catalog = os.path.join(tempfile.mkdtemp(), "marketway.json")
+    write_catalog(args.catalog, args.lines)
+    print(f"{args.lines} lines, {args.queries} queries ({args.distinct} distinct, Zipf), "
+          f"{args.latency_ms} ms simulated LLM latency")
+    print(f"{'mode':>9} {'workers':>7} {'RSS/worker':>11} {'PSS/worker':>11} {'private':>9} "
+          f"{'hit rate':>9} {'LLM calls':>10} {'wall':>7}")
+    for mode in ("private", "shared", "no-freeze"):
+        for workers in (int(w) for w in args.workers.split(",")):
+            start = time.perf_counter()
+            output = subprocess.run(
+                [sys.executable, __file__, "--run", mode, str(workers), "--catalog", args.catalog,
+                 "--queries", str(args.queries), "--distinct", str(args.distinct),
+                 "--latency-ms", str(args.latency_ms)],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            wall = time.perf_counter() - start
+            row = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:>9} {workers:>7} {row['rss_mb']:8.1f} MB {row['pss_mb']:8.1f} MB "
+                  f"{row['uss_mb']:6.1f} MB {row['hit_rate']:9.1%} {row['llm_calls']:>10} {wall:6.1f}s")
+
+
+if __name__ == "__main__":
+    main()
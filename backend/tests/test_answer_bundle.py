@@ -0,0 +1,129 @@
+import sys
+import os
+import json
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from app.services.answer_bundle import (
+    AnswerBundleService, BundleStore, apply_delta, build_bundle, diff_bundles, directions_for,
+)
+from app.services.compact_catalog import CompactCatalog
+
+
+MARKET = {
+    "l1": {"aisle": 1, "line_name": "rapa line", "items_sold": ["shoes", "bags"], "order": 1},
+    "l2": {"aisle": 1, "line_name": "godly line", "items_sold": ["shoes", "wigs"], "order": 2},
+    "li": {"aisle": 2, "line_name": "best line", "items_sold": ["wine"], "order": 1},
+}
+
+
+class FakeLoader:
+    def __init__(self, market):
+        self.catalog = CompactCatalog.from_market_data(market)
+
+    def get_walking_directions(self, line):
+        return f"Walk to aisle {line['aisle']}, line {line['order']}."
+
+    def get_image_url(self, line_id):
+        return f"/images/{line_id}.jpg"
+
+
+def changed_market():
+    market = json.loads(json.dumps(MARKET))
+    market["l2"]["items_sold"] = ["wigs", "beads"]
+    del market["li"]
+    market["l3"] = {"aisle": 1, "line_name": "wisdom line", "items_sold": ["wine"], "order": 3}
+    return market
+
+
+def test_bundle_is_content_hashed_and_answers_offline():
+    bundle = build_bundle(FakeLoader(MARKET))
+    assert bundle["version"] == build_bundle(FakeLoader(MARKET))["version"]
+    assert bundle["items"]["shoes"] == ["l1", "l2"]
+    assert bundle["lines"]["li"] == ["best line", 2, 1, "Walk to aisle 2, line 1.", "/images/li.jpg"]
+    assert directions_for(bundle, "Wine") == "Walk to aisle 2, line 1. Ask for Wine at best line."
+    assert directions_for(bundle, "umbrella") is None
+    assert build_bundle(FakeLoader(changed_market()))["version"] != bundle["version"]
+
+
+def test_delta_updates_old_bundle_to_new():
+    old, new = build_bundle(FakeLoader(MARKET)), build_bundle(FakeLoader(changed_market()))
+    delta = diff_bundles(old, new)
+    assert delta["lines"]["remove"] == ["li"]
+    assert sorted(delta["lines"]["upsert"]) == ["l3"]
+    assert delta["items"]["add"] == {"beads": ["l2"], "wine": ["l3"]}
+    assert delta["items"]["drop"] == {"shoes": ["l2"], "wine": ["li"]}
+    assert apply_delta(old, delta) == new
+
+    with pytest.raises(ValueError):
+        apply_delta(new, delta)
+
+
+def test_delta_reorders_items_of_moved_lines():
+    market = json.loads(json.dumps(MARKET))
+    market["l1"]["order"] = 5
+    old, new = build_bundle(FakeLoader(MARKET)), build_bundle(FakeLoader(market))
+    delta = diff_bundles(old, new)
+    assert delta["items"]["add"] == {} and delta["items"]["drop"] == {}
+    assert apply_delta(old, delta)["items"]["shoes"] == ["l2", "l1"]
+
+
+def test_service_serves_deltas_from_stored_versions(tmp_path):
+    store = BundleStore(str(tmp_path), keep=2)
+    old = build_bundle(FakeLoader(MARKET))
+    store.save(old)
+
+    service = AnswerBundleService(FakeLoader(changed_market()), store)
+    body, gzipped, etag = service.get_delta(old["version"])
+    assert apply_delta(old, json.loads(body))["version"] == service.version
+    assert etag == f'"{old["version"]}-{service.version}"'
+    assert service.get_delta("unknown") is None
+    assert json.loads(service.current[0]) == service.bundle
+
+    # Already current: an empty delta with a body, not a bodiless 304
+    body, _, _ = service.get_delta(service.version)
+    empty = json.loads(body)
+    assert empty["lines"] == {"upsert": {}, "remove": []}
+    assert empty["items"] == {"add": {}, "drop": {}, "remove": []}
+    assert apply_delta(service.bundle, empty) == service.bundle
+
+    store.save(service.bundle)
+    store.save(build_bundle(FakeLoader({})))
+    assert len(store.paths()) == 2
+
+
+def test_store_order_survives_a_fresh_checkout(tmp_path):
+    store = BundleStore(str(tmp_path), keep=3)
+    bundles = [build_bundle(FakeLoader(market)) for market in (MARKET, changed_market(), {})]
+    for bundle in bundles:
+        store.save(bundle)
+    # A checkout gives every file the same modification time, or the reverse order
+    for age, path in enumerate(store.paths()):
+        os.utime(path, (age, age))
+    assert [bundle["version"] for bundle in store.load()] == [bundle["version"] for bundle in reversed(bundles)]
+
+    store.save(bundles[1])  # rebuilding an older version makes it the newest again
+    store.save(build_bundle(FakeLoader({"l9": MARKET["l1"]})))
+    versions = [bundle["version"] for bundle in store.load()]
+    assert versions[1:] == [bundles[1]["version"], bundles[2]["version"]]
+
+
+def test_walking_directions_follow_the_market_layout():
+    from app.services.data_loader import data_loader, ordinal
+
+    def line(aisle, order):
+        return {"aisle": aisle, "order": order, "line_name": "test line"}
+
+    aisle_1 = data_loader.get_walking_directions(line(1, 2))
+    assert "walk straight down aisle 1" in aisle_1
+    assert "the second line on your RIGHT" in aisle_1
+
+    aisle_2 = data_loader.get_walking_directions(line(2, 3))
+    assert "first left turn, then the next right turn into aisle 2" in aisle_2
+    assert "the third line on your LEFT" in aisle_2
+
+    assert "the 12th line," in data_loader.get_walking_directions(line(7, 12))
+    assert [ordinal(n) for n in (11, 21, 22, 113)] == ["11th", "21st", "22nd", "113th"]
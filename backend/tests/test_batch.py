@@ -0,0 +1,72 @@
+import sys
+import os
+import asyncio
+from unittest.mock import patch
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.chat_handler import execute_batch, normalize_query
+from app.services.data_loader import data_loader
+from app.services.info_service import info_service
+from app.services.llm_service import llm_service
+from app.services.navigation_service import navigation_service
+from app.services.router_service import router_service
+
+
+def fake_routes(messages):
+    return [
+        {"action": "info", "topic": m, "original_message": m} if "history" in m
+        else {"action": "search", "query": m.split()[-1], "original_message": m}
+        for m in messages
+    ]
+
+
+def test_normalize_query():
+    assert normalize_query("  Where are SHOES?? ") == normalize_query("where are shoes")
+
+
+def test_search_lines_batch_matches_single_search_order():
+    matches = data_loader.search_lines_batch(["shoes", "medicine", "nothing-sells-this"])
+    assert matches[0]["line_name"] == data_loader.search_lines_batch(["shoes"])[0]["line_name"]
+    assert matches[1]["matched_term"] == "medicine"
+    assert matches[2] is None
+
+
+def test_execute_batch_dedupes_and_keeps_order():
+    with patch.object(router_service, "route_batch", side_effect=fake_routes) as route_batch, \
+            patch.object(llm_service, "extract_keywords", side_effect=lambda queries: queries), \
+            patch.object(navigation_service, "navigate", return_value="walk straight") as navigate, \
+            patch.object(info_service, "search", side_effect=RuntimeError("offline")):
+        results = asyncio.run(execute_batch([
+            "Where are shoes?", "where are SHOES", "market history", "where is medicine",
+        ]))
+
+    assert route_batch.call_count == 1
+    assert len(route_batch.call_args[0][0]) == 3
+    assert navigate.call_count == 2
+    assert results[0] == results[1] == {"direction": "walk straight", "name": results[0]["name"],
+                                        "line_id": results[0]["line_id"]}
+    assert "error" in results[2]
+    assert results[3]["direction"] == "walk straight"
+
+
+def test_execute_batch_routes_messages_as_typed():
+    with patch.object(router_service, "route_batch", side_effect=fake_routes) as route_batch, \
+            patch.object(llm_service, "extract_keywords", side_effect=lambda queries: queries), \
+            patch.object(navigation_service, "navigate", return_value="walk straight"):
+        asyncio.run(execute_batch(["Where are SHOES?", "where are shoes"]))
+    assert route_batch.call_args[0][0] == ["Where are SHOES?"]
+
+
+def test_execute_batch_starts_from_origin():
+    line = data_loader.search_lines_batch(["medicine"])[0]
+    origin = data_loader.get_line_position(line["line_id"])
+    with patch.object(router_service, "route_batch", side_effect=fake_routes), \
+            patch.object(llm_service, "extract_keywords", side_effect=lambda queries: queries), \
+            patch.object(navigation_service, "navigate", return_value="turn around") as navigate:
+        results = asyncio.run(execute_batch(["where is medicine"], origin=origin))
+    nearest = data_loader.nearest_lines(origin[0], origin[1], keyword="medicine", k=1)[0]
+    assert navigate.call_args[0][0]["line_id"] == nearest["line_id"]
+    assert navigate.call_args[1]["start"] == data_loader.describe_position(*origin)
+    assert results[0]["direction"] == "turn around"
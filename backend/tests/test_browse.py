@@ -0,0 +1,107 @@
+import sys
+import os
+import json
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from app.core.config import settings
+from app.services.browse_service import BrowseError, BrowseService, decode_cursor, encode_cursor, etag_matches
+from app.services.compact_catalog import CompactCatalog
+
+
+MARKET = {
+    f"l{i}": {"aisle": 1 + i % 2, "line_name": f"Line {i}", "items_sold": ["shoes", f"item{i}"], "order": 10 - i}
+    for i in range(7)
+}
+
+
+class FakeLoader:
+    def __init__(self):
+        self.catalog = CompactCatalog.from_market_data(MARKET)
+
+    def get_direction(self, line):
+        return f"Aisle {line['aisle']}, Position {line['order']}"
+
+    def get_image_url(self, line_id):
+        return "/images/l0.jpg" if line_id == "l0" else None
+
+
+@pytest.fixture
+def browse():
+    return BrowseService(FakeLoader(), page_size=2)
+
+
+def test_catalog_indexes():
+    catalog = CompactCatalog.from_market_data(MARKET)
+    assert [catalog.line_ids[row] for row in catalog.rows_by_aisle[1]] == ["l6", "l4", "l2", "l0"]
+    assert catalog.line_ids[catalog.rows_by_name["line 3"]] == "l3"
+    assert len(catalog.rows_by_item["shoes"]) == 7
+
+
+def test_aisle_pages_follow_cursor(browse):
+    body, _ = browse.get_aisle_lines(1)
+    page = json.loads(body)
+    assert [line["line_id"] for line in page["items"]] == ["l6", "l4"]
+    assert page["total"] == 4
+
+    seen = []
+    cursor = None
+    while True:
+        page = json.loads(browse.get_aisle_lines(1, cursor)[0])
+        seen += [line["line_id"] for line in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == ["l6", "l4", "l2", "l0"]
+
+    # Other page sizes are rendered on demand
+    page = json.loads(browse.get_aisle_lines(1, limit=3)[0])
+    assert len(page["items"]) == 3
+    assert decode_cursor(page["next_cursor"]) == 3
+    assert browse.get_aisle_lines(9) is None
+
+
+def test_line_detail_and_items(browse):
+    line = json.loads(browse.get_line("l0")[0])
+    assert line["items_sold"] == ["shoes", "item0"]
+    assert line["direction"] == "Aisle 1, Position 10"
+    assert line["image_url"] == "/images/l0.jpg"
+    assert browse.get_line("missing") is None
+
+    page = json.loads(browse.get_items(limit=10)[0])
+    assert page["items"][-1] == {"item": "shoes", "line_count": 7}
+
+
+def test_bad_cursor_and_limit(browse):
+    with pytest.raises(BrowseError):
+        browse.get_items("not a cursor!")
+    with pytest.raises(BrowseError):
+        browse.get_items(encode_cursor(100))
+    with pytest.raises(BrowseError):
+        browse.get_items(limit=100000)
+
+
+@pytest.mark.parametrize("limit", [0, -1, settings.BROWSE_MAX_PAGE_SIZE + 1])
+def test_limit_out_of_range_is_rejected(browse, limit):
+    with pytest.raises(BrowseError):
+        browse.get_items(limit=limit)
+    with pytest.raises(BrowseError):
+        browse.get_aisle_lines(1, limit=limit)
+
+
+def test_limit_bounds_are_inclusive(browse):
+    assert len(json.loads(browse.get_items(limit=1)[0])["items"]) == 1
+    browse.get_items(limit=settings.BROWSE_MAX_PAGE_SIZE)
+
+
+def test_etags_are_strong_and_stable(browse):
+    body, etag = browse.get_aisles()
+    assert etag.startswith('"') and BrowseService(FakeLoader(), page_size=2).get_aisles()[1] == etag
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
@@ -0,0 +1,53 @@
+import sys
+import os
+import time
+from unittest.mock import patch
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.cache import ResultCache, normalize_query
+from app.services.router_service import router_service
+from app.services.token_accounting import token_accountant
+
+
+def test_lru_eviction_and_stats():
+    cache = ResultCache("test", max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire():
+    cache = ResultCache("test", max_entries=10, ttl=60)
+    cache.set("a", 1, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert "a" not in cache
+
+
+def test_normalize_query():
+    assert normalize_query("  Where are SHOES?? ") == "where are shoes"
+
+
+def test_router_caches_only_parsed_model_output():
+    router_service.cache.clear()
+    with patch.object(token_accountant, "invoke", return_value="not json") as invoke:
+        assert router_service.route("where are wigs")["query"] == "where are wigs"
+        router_service.route("where are wigs")
+        router_service.route_batch(["where are wigs"])
+    # The fallback was never cached, so every call asked the model again
+    assert invoke.call_count == 4
+
+    with patch.object(token_accountant, "invoke", return_value='[{"action": "search", "data": "wigs"}, "oops"]'):
+        routes = router_service.route_batch(["where are wigs", "where is wine"])
+    assert routes[0]["query"] == "wigs" and routes[1]["query"] == "where is wine"
+    assert normalize_query("where are wigs") in router_service.cache
+    assert normalize_query("where is wine") not in router_service.cache
+    router_service.cache.clear()
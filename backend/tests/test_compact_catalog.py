@@ -0,0 +1,57 @@
+import sys
+import os
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.compact_catalog import CompactCatalog, MatchView
+
+
+MARKET = {
+    "l2": {"aisle": 1, "line_name": "godly line", "items_sold": ["shoes", "bags"], "order": 2},
+    "l1": {"aisle": 1, "line_name": "rapa line", "items_sold": ["jewelries", "Shoes"], "order": 1,
+           "position": {"x": 292, "y": 313}},
+    "li": {"aisle": 2, "line_name": "best line", "items_sold": ["pharmacy", "bags"], "order": 1},
+}
+
+
+def test_rows_sorted_and_viewed_like_dicts():
+    catalog = CompactCatalog.from_market_data(MARKET)
+    assert [line["line_id"] for line in catalog] == ["l1", "l2", "li"]
+
+    line = catalog.by_id("l1")
+    assert dict(line) == {
+        "line_id": "l1",
+        "line_name": "rapa line",
+        "aisle": 1,
+        "items_sold": ("jewelries", "Shoes"),
+        "order": 1,
+        "position": {"x": 292, "y": 313},
+    }
+    assert catalog.by_id("l2").get("position") is None
+    assert catalog.by_id("missing") is None
+
+
+def test_items_are_interned_once():
+    catalog = CompactCatalog.from_market_data(MARKET)
+    assert len(catalog.item_ids) == 6
+    assert len(catalog.vocab) == 5
+    assert catalog.by_id("l2")["items_sold"][1] is catalog.by_id("li")["items_sold"][1]
+    assert list(catalog.postings[catalog.vocab_ids["bags"]]) == [1, 2]
+
+
+def test_find_matches_first_line_in_order():
+    catalog = CompactCatalog.from_market_data(MARKET)
+    assert catalog.find("shoe") == [(0, "item", "Shoes")]
+    assert catalog.find("best") == [(2, "line_name", "best line")]
+    assert catalog.find("bags", first_only=False) == [(1, "item", "bags"), (2, "item", "bags")]
+    assert catalog.find("umbrella") == []
+
+
+def test_match_view_exposes_line_and_match_fields():
+    catalog = CompactCatalog.from_market_data(MARKET)
+    match = MatchView(catalog[0], "item", "Shoes", "Aisle 1, Position 1")
+    merged = {**match}
+    assert merged["line_name"] == "rapa line"
+    assert merged["matched_term"] == "Shoes"
+    assert "distance" not in merged
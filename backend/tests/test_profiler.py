@@ -0,0 +1,102 @@
+import asyncio
+import sys
+import os
+import time
+import tracemalloc
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.profiler import SamplingProfiler
+
+
+def busy_loop(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(100))
+    return total
+
+
+def test_disabled_profiler_never_samples():
+    profiler = SamplingProfiler(enabled=False, token="secret", sample_rate=1.0)
+    assert not profiler.should_profile("secret")
+    assert not profiler.is_authorized("secret")
+
+
+def test_token_header_forces_profiling():
+    profiler = SamplingProfiler(enabled=True, token="secret", sample_rate=0.0)
+    assert profiler.should_profile("secret")
+    assert not profiler.should_profile("wrong")
+    assert not profiler.should_profile(None)
+
+
+def test_profile_collects_collapsed_stacks():
+    profiler = SamplingProfiler(enabled=True, interval=0.001)
+    with profiler.profile():
+        busy_loop(0.05)
+
+    collapsed = profiler.collapsed("cpu")
+    assert profiler.samples > 0
+    assert "test_profiler.py:busy_loop" in collapsed
+    stack, count = collapsed.splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 0
+
+
+def test_profile_traces_allocations():
+    profiler = SamplingProfiler(enabled=True, trace_allocations=True)
+    with profiler.profile():
+        kept = [bytearray(1024) for _ in range(100)]
+    assert sum(profiler.alloc_stacks.values()) >= 100 * 1024
+    assert kept
+
+
+def test_profile_samples_offloaded_calls_not_interleaved_requests():
+    profiler = SamplingProfiler(enabled=True, interval=0.001)
+
+    def offloaded_work():
+        return busy_loop(0.05)
+
+    async def profiled_request():
+        with profiler.profile():
+            await asyncio.to_thread(profiler.bind(offloaded_work))
+            await asyncio.sleep(0.03)
+
+    async def other_request():
+        # Runs on the loop while the profiled request is waiting
+        await asyncio.sleep(0.06)
+        busy_loop(0.03)
+
+    async def main():
+        await asyncio.gather(profiled_request(), other_request())
+
+    asyncio.run(main())
+    collapsed = profiler.collapsed("cpu")
+    assert "test_profiler.py:offloaded_work" in collapsed
+    assert "test_profiler.py:other_request" not in collapsed
+    assert profiler.profiled_requests == 1
+
+
+def test_bind_is_a_no_op_outside_profiled_requests():
+    profiler = SamplingProfiler(enabled=True)
+    assert profiler.bind(busy_loop) is busy_loop
+
+
+def test_profile_leaves_existing_tracing_on():
+    tracemalloc.start()
+    try:
+        profiler = SamplingProfiler(enabled=True, trace_allocations=True)
+        with profiler.profile():
+            kept = [bytearray(1024) for _ in range(10)]
+        assert tracemalloc.is_tracing()
+        assert kept
+    finally:
+        tracemalloc.stop()
+
+
+def test_token_check_handles_missing_and_non_ascii_tokens():
+    profiler = SamplingProfiler(enabled=True, token="secret")
+    assert profiler.is_authorized("secret")
+    assert not profiler.is_authorized("sécret")
+    assert not profiler.is_authorized(None)
+    assert not SamplingProfiler(enabled=True, token="").is_authorized("")
@@ -0,0 +1,59 @@
+import sys
+import os
+
+import pytest
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.prompts import TEMPLATES, get_template
+from app.services.token_accounting import TokenAccountant, estimate_tokens
+
+
+class EchoModel:
+    def invoke(self, prompt):
+        return "shoes"
+
+
+class FailingModel:
+    def invoke(self, prompt):
+        raise RuntimeError("quota exceeded")
+
+
+def test_prefix_is_static_across_requests():
+    template = get_template("navigation", "full")
+    first = template.render(start="the main gate", line_name="godly line", direction="Aisle 1, Position 2", interest="shoes")
+    second = template.render(start="the main gate", line_name="mothers line", direction="Aisle 2, Position 5", interest="medicine")
+    assert first.startswith(template.prefix)
+    assert second.startswith(template.prefix)
+    assert "godly line" not in template.prefix
+
+
+def test_compact_variants_are_smaller():
+    for stage, variants in TEMPLATES.items():
+        assert estimate_tokens(variants["compact"].prefix) < estimate_tokens(variants["full"].prefix), stage
+
+
+def test_unknown_variant_falls_back_to_full():
+    assert get_template("router", "tiny") is get_template("router", "full")
+
+
+def test_accountant_records_per_stage():
+    accountant = TokenAccountant()
+    template = get_template("keyword", "compact")
+    assert accountant.invoke(EchoModel(), template, query="I need a shoe") == "shoes"
+    accountant.invoke(EchoModel(), template, query="red dress")
+
+    stage = accountant.snapshot()["stages"]["keyword"]
+    assert stage["calls"] == 2
+    assert stage["output_tokens"] == 2 * estimate_tokens("shoes")
+    assert stage["input_tokens"] > stage["prefix_tokens"] > 0
+
+
+def test_accountant_records_errors():
+    accountant = TokenAccountant()
+    with pytest.raises(RuntimeError):
+        accountant.invoke(FailingModel(), get_template("router"), message="hi")
+    stage = accountant.snapshot()["stages"]["router"]
+    assert stage["calls"] == 1
+    assert stage["errors"] == 1
@@ -0,0 +1,59 @@
+import sys
+import os
+from datetime import datetime
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.query_analytics import build_report, next_prewarm_time, read_entries, select_prewarm_queries
+from app.services.query_log import QueryLog
+
+
+def test_log_writes_normalized_entries(tmp_path):
+    log = QueryLog(str(tmp_path / "queries.jsonl"))
+    log.record("  Where are SHOES? ", "search", "l2", 0.0123)
+    log.flush()
+
+    entries = list(read_entries(log.files()))
+    assert len(entries) == 1
+    assert entries[0]["query"] == "where are shoes"
+    assert entries[0]["line_id"] == "l2"
+    assert entries[0]["latency_ms"] == 12.3
+
+
+def test_log_rotates_by_size(tmp_path):
+    log = QueryLog(str(tmp_path / "queries.jsonl"), max_bytes=200, backups=2)
+    for i in range(20):
+        log.record(f"query {i}", "search", None, 0.0)
+        log.flush()
+
+    files = log.files()
+    assert len(files) == 3
+    assert all(os.path.getsize(path) <= 200 for path in files)
+    assert [entry["query"] for entry in read_entries(files)][-1] == "query 19"
+
+
+def test_report_by_hour_and_trending():
+    eight_am = datetime(2026, 10, 12, 8, 15).timestamp()
+    three_pm = datetime(2026, 10, 12, 15, 15).timestamp()
+    now = datetime(2026, 10, 13, 12, 0).timestamp()
+    entries = (
+        [{"ts": eight_am, "query": "dry fish", "intent": "search", "latency_ms": 900}] * 5
+        + [{"ts": three_pm, "query": "shoes", "intent": "search", "latency_ms": 700}] * 3
+        + [{"ts": eight_am - 10 * 86400, "query": "shoes", "intent": "search", "latency_ms": 800}] * 3
+    )
+
+    report = build_report(entries, now=now)
+    assert report["by_hour"][8][0] == ("dry fish", 5)
+    assert report["trending"][0] == ("dry fish", 5.0)
+    assert report["popular"][0] == ("shoes", 6)
+    assert select_prewarm_queries(report, hours=[6, 7, 8], limit=2) == ["dry fish", "shoes"]
+
+
+def test_next_prewarm_time_skips_non_market_days(monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "MARKET_DAYS", "wed,sat")
+    monkeypatch.setattr(settings, "PREWARM_TIME", "05:30")
+
+    # Monday 2026-10-12 at 09:00 -> Wednesday 05:30
+    assert next_prewarm_time(datetime(2026, 10, 12, 9, 0)) == datetime(2026, 10, 14, 5, 30)
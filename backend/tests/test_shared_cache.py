@@ -0,0 +1,70 @@
+import sys
+import os
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.workers import is_primary_worker
+from app.serve import run_workers
+from app.services.cache import ResultCache, SharedCache, TieredCache
+
+
+def test_shared_cache_round_trip_and_expiry(tmp_path):
+    cache = SharedCache("navigation", str(tmp_path / "shared.sqlite3"), max_entries=100, ttl=60)
+    key = ("godly line", "Aisle 1, Position 2", "shoes", None)
+    cache.set(key, "Walk straight")
+    assert cache.get(key) == "Walk straight"
+    assert key in cache
+    cache.set("old", {"action": "search"}, ttl=-1)
+    assert cache.get("old", "missing") == "missing"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Same file, another cache name: separate entries
+    assert SharedCache("routing", cache.path, 100, 60).get(key) is None
+
+
+def test_shared_cache_prunes_to_max_entries(tmp_path):
+    cache = SharedCache("info", str(tmp_path / "shared.sqlite3"), max_entries=5, ttl=60, prune_every=10)
+    for i in range(10):
+        cache.set(f"topic {i}", i, ttl=60 + i)
+    count = cache._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    assert count == 5
+    assert cache.get("topic 9") == 9 and cache.get("topic 0") is None
+
+
+def test_tiered_cache_reads_through_to_shared(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    first = TieredCache(ResultCache("routing", 10, 60), SharedCache("routing", path, 100, 60))
+    second = TieredCache(ResultCache("routing", 10, 60), SharedCache("routing", path, 100, 60))
+    first.set("where are shoes", {"action": "search", "query": "shoes"})
+    assert second.get("where are shoes") == {"action": "search", "query": "shoes"}
+    # Now served from second's local tier
+    assert second.get("where are shoes") is not None
+    stats = second.stats()
+    assert (stats["hits"], stats["shared"]["hits"], stats["hit_rate"]) == (1, 1, 1.0)
+
+
+def test_forked_workers_share_entries(tmp_path):
+    cache = SharedCache("navigation", str(tmp_path / "shared.sqlite3"), max_entries=100, ttl=60)
+    cache.set("warm", "from the parent")
+
+    def worker():
+        # Each worker opens its own connection after the fork
+        assert cache.get("warm") == "from the parent"
+        cache.set(f"pid {os.getpid()}", "from a worker")
+
+    assert run_workers(3, worker, restart=False) == 0
+    rows = cache._connection().execute("SELECT COUNT(*) FROM entries WHERE key LIKE '%pid%'").fetchone()[0]
+    assert rows == 3
+
+
+def test_only_worker_zero_runs_background_jobs(tmp_path):
+    assert is_primary_worker()  # single process
+
+    def worker():
+        with open(tmp_path / f"worker-{os.getpid()}", "w") as f:
+            f.write("primary" if is_primary_worker() else "secondary")
+
+    assert run_workers(3, worker, restart=False) == 0
+    roles = sorted((tmp_path / name).read_text() for name in os.listdir(tmp_path))
+    assert roles == ["primary", "secondary", "secondary"]
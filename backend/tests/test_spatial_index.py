@@ -0,0 +1,45 @@
+import sys
+import os
+import math
+import random
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.spatial_index import GridIndex, SpatialIndex
+
+
+def brute_force(positions, x, y, k, allowed=None):
+    candidates = [
+        (math.dist(point, (x, y)), line)
+        for line, point in positions.items()
+        if allowed is None or line in allowed
+    ]
+    return sorted(candidates)[:k]
+
+
+def test_grid_matches_brute_force():
+    rng = random.Random(7)
+    points = [(rng.uniform(0, 600), rng.uniform(0, 1000)) for _ in range(2000)]
+    grid = GridIndex(points, list(range(len(points))))
+    positions = dict(enumerate(points))
+    for _ in range(200):
+        # Include query points outside the indexed area
+        x, y = rng.uniform(-200, 800), rng.uniform(-200, 1200)
+        expected = brute_force(positions, x, y, 5)
+        assert [line for _, line in grid.nearest(x, y, 5)] == [line for _, line in expected]
+
+
+def test_nearest_filtered_by_item():
+    positions = {0: (0, 0), 1: (10, 0), 2: (20, 0), 3: (30, 0)}
+    items = {0: ["shoes"], 1: ["wine"], 2: ["shoes", "wine"], 3: ["bags"]}
+    index = SpatialIndex(positions, items)
+
+    assert [line for _, line in index.nearest(11, 0, 2, items=["shoes"])] == [2, 0]
+    assert [line for _, line in index.nearest(11, 0, 3, items=["shoes", "wine"])] == [1, 2, 0]
+    assert index.nearest(11, 0, 2, items=["fish"]) == []
+
+
+def test_empty_index():
+    index = SpatialIndex({}, {})
+    assert index.nearest(0, 0, 3) == []
@@ -0,0 +1,166 @@
+import sys
+import os
+import wave
+import io
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from app.services.compact_catalog import CompactCatalog
+from app.services.speech_service import AudioCache, SpeechService, TTSEngine, ToneEngine, parse_range
+
+
+class CountingEngine(TTSEngine):
+    name = "counting"
+    media_type = "audio/mpeg"
+    extension = "mp3"
+
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    def synthesize(self, text):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("offline")
+        return text.encode() * 10
+
+
+class FakeLoader:
+    def __init__(self):
+        self.catalog = CompactCatalog.from_market_data({
+            "l1": {"aisle": 1, "line_name": "rapa line", "items_sold": ["shoes", "bags"], "order": 1},
+        })
+
+    def get_all_lines(self):
+        return self.catalog
+
+    def get_match(self, line_id, item=None):
+        line = self.catalog.by_id(line_id)
+        if line is None or (item is not None and item not in line["items_sold"]):
+            return None
+        return {"line_name": line["line_name"], "aisle": line["aisle"], "order": line["order"],
+                "match_type": "item" if item else "line_name", "matched_term": item or line["line_name"]}
+
+    def get_walking_directions(self, line):
+        return f"Walk down aisle {line['aisle']} to {line['line_name']}."
+
+
+class FakeNavigator:
+    """Phrases the directions differently on every call, like the LLM"""
+
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    def generate(self, match):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("LLM unavailable")
+        return f"Walk to {match['line_name']} for {match['matched_term']} ({self.calls})."
+
+
+def make_service(tmp_path, engine, max_bytes=10_000, navigator=None):
+    return SpeechService(engine, AudioCache(str(tmp_path), max_bytes), FakeLoader(),
+                         navigator or FakeNavigator(), ToneEngine())
+
+
+def test_speak_synthesizes_once_and_survives_restart(tmp_path):
+    engine = CountingEngine()
+    service = make_service(tmp_path, engine)
+    data, media_type, etag = service.speak("l1", "shoes")
+    assert service.speak("l1", "shoes") == (data, media_type, etag)
+    assert engine.calls == 1 and media_type == "audio/mpeg"
+    assert service.navigator.calls == 1
+
+    # New process: the directions would be phrased differently, but are not regenerated
+    restarted = make_service(tmp_path, engine)
+    assert restarted.speak("l1", "shoes")[2] == etag
+    assert engine.calls == 1 and restarted.navigator.calls == 0
+    assert service.speak("l1", "wine") is None
+
+
+def test_failed_engine_falls_back_to_offline_tone(tmp_path):
+    engine = CountingEngine(fail=True)
+    service = make_service(tmp_path, engine)
+    data, media_type, _ = service.speak("l1")
+    assert media_type == "audio/wav"
+    assert service.navigator.calls == 1
+    with wave.open(io.BytesIO(data)) as wav:
+        assert wav.getnframes() > 0
+
+    # Cooling down: other pairs go straight to the fallback without retrying the network engine
+    assert service.speak("l1", "bags")[1] == "audio/wav"
+    assert engine.calls == 1
+    service.failure_cooldown = 0
+    service._retry_at.clear()
+    service.speak("l1", "shoes")
+    assert engine.calls == 2
+
+
+def test_llm_failure_is_spoken_but_not_cached(tmp_path):
+    engine = CountingEngine()
+    navigator = FakeNavigator(fail=True)
+    service = make_service(tmp_path, engine, navigator=navigator)
+    data, _, _ = service.speak("l1", "shoes")
+    assert data == b"Walk down aisle 1 to rapa line. Ask for shoes." * 10
+    assert service.cache.stats()["files"] == 0 and os.listdir(tmp_path) == []
+
+    # Once the LLM is back, its directions are synthesized and cached
+    navigator.fail = False
+    data, _, _ = service.speak("l1", "shoes")
+    assert b"(2)" in data
+    assert service.cache.stats()["files"] == 1
+    assert (engine.calls, service.uncached) == (2, 1)
+
+
+def test_cache_adopts_files_written_by_other_workers(tmp_path):
+    first = AudioCache(str(tmp_path), max_bytes=250)
+    second = AudioCache(str(tmp_path), max_bytes=250)
+    first.put("a", "mp3", b"x" * 100)
+    assert second.get("a", "mp3") is not None
+    assert second.total_bytes == 100
+
+    # second's writes push the shared directory over the limit: it evicts "a" too
+    second.put("b", "mp3", b"x" * 100)
+    second.put("c", "mp3", b"x" * 100)
+    assert second.total_bytes <= 250
+    assert first.get("a", "mp3") is None
+    assert first.get("c", "mp3") is not None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=250)
+    for key in ("a", "b", "c"):
+        cache.put(key, "mp3", b"x" * 100)
+    assert cache.get("a", "mp3") is None and cache.get("c", "mp3") is not None
+    assert cache.total_bytes <= 250 and cache.stats()["evictions"] == 1
+
+
+def test_pregenerate_covers_every_line_item_pair(tmp_path):
+    engine = CountingEngine()
+    service = make_service(tmp_path, engine)
+    assert service.pregenerate()["pairs"] == 3
+    assert engine.calls == 3
+    service.pregenerate()
+    assert engine.calls == 3
+
+
+def test_tone_engine_is_valid_wav():
+    with wave.open(io.BytesIO(ToneEngine().synthesize("go to aisle one"))) as wav:
+        assert (wav.getnchannels(), wav.getsampwidth()) == (1, 2)
+
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=100-", 100)
+    with pytest.raises(ValueError):
+        parse_range("bytes=x-y", 100)
@@ -0,0 +1,50 @@
+import sys
+import os
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.spell_index import SpellIndex, edit_distance, singular
+
+
+def make_index():
+    index = SpellIndex()
+    for term, frequency in [("shoes", 5), ("shoe", 1), ("bags", 4), ("kitchenutensils", 3),
+                            ("jewelries", 2), ("medicine", 2), ("wine", 3), ("wigs", 3)]:
+        index.add(term, frequency)
+        index.add(singular(term), frequency, term)
+    return index
+
+
+def test_edit_distance():
+    assert edit_distance("shoos", "shoes", 2) == 1
+    assert edit_distance("jewlery", "jewelry", 2) == 1  # transposition
+    assert edit_distance("abc", "xyzabc", 2) == 3
+
+
+def test_lookup_ranks_by_distance_then_frequency():
+    index = make_index()
+    assert [s.term for s in index.lookup("shoes")][:1] == ["shoes"]
+    assert index.lookup("shoos")[0].term == "shoes"
+    assert index.lookup("jewlery")[0].term == "jewelries"
+    assert index.lookup("medecine")[0].term == "medicine"
+    # "wins" is one edit from both; wine and wigs tie on frequency, so by name
+    assert [s.term for s in index.lookup("wins")] == ["wigs", "wine"]
+    assert index.lookup("umbrella") == []
+
+
+def test_short_words_need_exact_match():
+    index = make_index()
+    index.add("cans", 9)
+    assert index.lookup("can") == []
+
+
+def test_lookup_compound_joins_and_splits_words():
+    index = make_index()
+    assert index.lookup_compound("where can I buy shoos?").term == "shoes"
+    joined = index.lookup_compound("do you sell kitchen utensils")
+    assert (joined.term, joined.distance, joined.words) == ("kitchenutensils", 0, 2)
+    assert index.lookup_compound("kichen utensls").term == "kitchenutensils"
+    split = index.lookup_compound("shoesbags")
+    assert split.term == "shoes" and split.distance == 1
+    assert index.lookup_compound("where is the market") is None
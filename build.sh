@@ -4,4 +4,7 @@
 echo "Installing dependencies from backend/requirements.txt..."
 pip install -r backend/requirements.txt
 
+echo "Building the offline answer bundle..."
+(cd backend && python -m app.services.answer_bundle) || echo "Answer bundle build failed; the API builds it at startup"
+
 echo "Build completed successfully!"